@@ -1,6 +1,7 @@
 from action_engine.action import Action
+from action_engine.context import RunContext
 from action_engine.engine import Engine
 from action_engine.param_functions import Tag, Deps
 from action_engine import utils
 
-__all__ = ["Action", "Engine", "Tag", "Deps"]
\ No newline at end of file
+__all__ = ["Action", "Engine", "RunContext", "Tag", "Deps"]
\ No newline at end of file
@@ -1,9 +1,18 @@
 import asyncio
-from collections.abc import Generator
-from inspect import iscoroutinefunction
+import pickle
+import time
+import collections.abc
+from collections.abc import AsyncIterator, Generator
+from concurrent.futures import Executor
+from functools import partial
+from inspect import iscoroutinefunction, isasyncgenfunction, isgeneratorfunction
 from types import NoneType
 from typing import Callable, Any, get_type_hints, get_origin, get_args
 
+from action_engine.cache import CachePolicy, CacheStore, MemoryCacheStore, fingerprint
+from action_engine.executors import call_in_process
+from action_engine.resources import Resource
+from action_engine.retry import RateLimiter, RetryPolicy
 from action_engine.param import (
     ParamSet,
     StatefulParamSet,
@@ -11,7 +20,19 @@ from action_engine.param import (
     InputParam,
 )
 from action_engine.param_functions import TagMetaData, DepsMetaData
-from action_engine.types import Displayable
+from action_engine.types import Displayable, ExecutorKind
+
+
+_NO_RETRY = RetryPolicy()
+
+_GENERATOR_ORIGINS = (
+    collections.abc.Iterator,
+    collections.abc.Iterable,
+    collections.abc.Generator,
+    collections.abc.AsyncIterator,
+    collections.abc.AsyncIterable,
+    collections.abc.AsyncGenerator,
+)
 
 
 class Action[**I, O](Displayable):
@@ -19,25 +40,97 @@ class Action[**I, O](Displayable):
     _name: str
     _final: bool
     _description: str
+    _executor: ExecutorKind
+    _cache: CachePolicy | None
+    _cache_store: CacheStore | None
+    _speculative: bool
+    _streaming: bool
+    _retry: RetryPolicy | None
+    _limiter: RateLimiter | None
+    _injected: tuple[tuple[str, Resource[Any]], ...]
     _input_params: ParamSet[InputParam]
     _output_params: ParamSet[OutputParam]
+    _input_names: tuple[str, ...]
+    _outputs: tuple[OutputParam, ...]
 
-    def __init__(self, fn: Callable[I, O], final: bool, description: str) -> None:
+    def __init__(
+        self,
+        fn: Callable[I, O],
+        final: bool,
+        description: str,
+        executor: ExecutorKind = "inline",
+        cache: CachePolicy | None = None,
+        speculative: bool = False,
+        retry: RetryPolicy | None = None,
+        limiter: RateLimiter | None = None,
+        resources: dict[str, Resource[Any]] | None = None,
+    ) -> None:
+        streaming = isgeneratorfunction(fn) or isasyncgenfunction(fn)
+        if executor != "inline" and (iscoroutinefunction(fn) or streaming):
+            kind = "generator" if streaming else "coroutine"
+            raise ValueError(
+                f"Action {fn.__name__} is a {kind} function, "
+                f"executor={executor!r} only applies to plain functions"
+            )
+        if streaming and cache is not None:
+            raise ValueError(f"Action {fn.__name__} is a generator and cannot be cached")
+        if streaming and retry is not None:
+            raise ValueError(
+                f"Action {fn.__name__} is a generator and cannot be retried, "
+                f"its partial outputs are already applied"
+            )
+        if executor == "process" and "<locals>" in fn.__qualname__:
+            raise ValueError(
+                f"Action {fn.__name__} must be defined at module level "
+                f"to run with executor='process'"
+            )
         self._fn = fn
         self._name = fn.__name__
         self._final = final
         self._description = description
+        if (
+            retry is not None
+            and retry.timeout is not None
+            and executor == "inline"
+            and not iscoroutinefunction(fn)
+        ):
+            # A blocking call can only be timed out from outside its thread
+            executor = "thread"
+        self._executor = executor
+        self._cache = cache
+        self._speculative = speculative
+        self._streaming = streaming
+        self._retry = retry
+        self._limiter = limiter
+        self._cache_store = None
+        if cache is not None:
+            self._cache_store = cache.store or MemoryCacheStore(cache.maxsize)
 
         self._input_params = ParamSet([])
         self._output_params = ParamSet([])
 
-        # Extract return type
+        # Params naming or typed as a resource are injected, not read from state
+        injected = []
         for param1 in self._extract_input_params(fn):
-            self._input_params.add(param1)
+            res = self._match_resource(param1, resources or {})
+            if res is None:
+                self._input_params.add(param1)
+            else:
+                injected.append((param1.name, res))
+        # Lease in a fixed order so that actions sharing resources cannot deadlock
+        self._injected = tuple(sorted(injected, key=lambda pair: pair[1].name))
+        if injected and executor == "process":
+            raise ValueError(
+                f"Action {fn.__name__} uses resources, which cannot be sent "
+                f"to a process pool"
+            )
 
         for param2 in self._extract_output_params(fn):
             self._output_params.add(param2)
 
+        self._input_names = tuple(p.name for p in self._input_params)
+        self._outputs = tuple(self._output_params)
+
     @property
     def name(self) -> str:
         return self._name
@@ -50,6 +143,39 @@ class Action[**I, O](Displayable):
     def description(self) -> str:
         return self._description
 
+    @property
+    def executor(self) -> ExecutorKind:
+        return self._executor
+
+    @property
+    def speculative(self) -> bool:
+        return self._speculative
+
+    @property
+    def streaming(self) -> bool:
+        """True for (async) generator actions, which yield their outputs incrementally."""
+        return self._streaming
+
+    @property
+    def retry(self) -> RetryPolicy | None:
+        return self._retry
+
+    @property
+    def resources(self) -> dict[str, Resource[Any]]:
+        """The resources injected into this action, by param name."""
+        return dict(self._injected)
+
+    @property
+    def cache(self) -> CachePolicy | None:
+        return self._cache
+
+    @property
+    def cache_store(self) -> CacheStore:
+        """The store behind this action's cache policy, e.g. for hit/miss counts."""
+        if self._cache_store is None:
+            raise ValueError(f"Action {self._name} has no cache policy")
+        return self._cache_store
+
     @property
     def input_params(self) -> ParamSet[InputParam]:
         return self._input_params
@@ -73,12 +199,34 @@ class Action[**I, O](Displayable):
                 else:
                     yield InputParam(name=param_name, type_=param_type, deps=[])
 
+    def _match_resource(
+        self, param: InputParam, resources: dict[str, Resource[Any]]
+    ) -> Resource[Any] | None:
+        if param.name in resources:
+            return resources[param.name]
+        # Only match classes of their own: builtins such as str, or a base
+        # class such as object, would capture unrelated params.
+        type_ = param.type_
+        if not isinstance(type_, type) or type_.__module__ == "builtins":
+            return None
+        matches = [r for r in resources.values() if r.type_ is type_]
+        if len(matches) > 1:
+            raise ValueError(
+                f"Param {param.name!r} of action {self._name} matches several "
+                f"resources by type: {', '.join(r.name for r in matches)}"
+            )
+        return matches[0] if matches else None
+
     @staticmethod
     def _extract_output_params(
         fn: Callable[I, O],
     ) -> Generator[OutputParam, None, None]:
         type_hints = get_type_hints(fn, include_extras=True)
         return_type = type_hints.get("return", Any)
+        if isgeneratorfunction(fn) or isasyncgenfunction(fn):
+            # Generators declare their outputs as the yield type
+            if get_origin(return_type) in _GENERATOR_ORIGINS:
+                return_type = get_args(return_type)[0]
 
         if hasattr(return_type, "__metadata__"):  # Handle one
             base_type = return_type.__origin__
@@ -96,7 +244,7 @@ class Action[**I, O](Displayable):
                 for sub_return_type in get_args(return_type):
                     if hasattr(sub_return_type, "__metadata__"):
                         base_type = sub_return_type.__origin__
-                        metadata = return_type.__metadata__
+                        metadata = sub_return_type.__metadata__[0]
                         assert isinstance(metadata, TagMetaData)
                         yield OutputParam(
                             name=metadata.name,
@@ -149,35 +297,224 @@ class Action[**I, O](Displayable):
             ret2.append(str(p2) + "\n")
         return ["".join(ret1), "".join(ret2)]
 
-    def invoke(self, state: StatefulParamSet) -> list[tuple[OutputParam, Any]]:
+    def _resolve(self, state: StatefulParamSet) -> dict[str, Any]:
         try:
-            params_dict = {p.name: state.get_state(p.name) for p in self._input_params}
+            return {name: state.get_state(name) for name in self._input_names}
         except KeyError as e:
             raise ValueError("Missing required parameter: " + str(e))
-        if iscoroutinefunction(self._fn):
-            result = asyncio.run(self._fn(**params_dict))
-        else:
-            result = self._fn(**params_dict)
 
-        rt: list[tuple[OutputParam, Any]] = []
-        if not self._output_params:
-            return rt
-
-        if isinstance(result, tuple):
-            for p, val in zip(self._output_params, result):
-                rt.append(
-                    (
-                        OutputParam(**p.model_dump(exclude={"type_"}), type_=type(val)),
-                        val,
-                    )
-                )
+    def _pickle_inputs(self, params_dict: dict[str, Any]) -> bytes:
+        try:
+            return pickle.dumps(params_dict)
+        except Exception:
+            pass
+        # Pickle the params one by one to report which one failed.
+        for name, val in params_dict.items():
+            try:
+                pickle.dumps(val)
+            except Exception as e:
+                raise TypeError(
+                    f"Action {self._name} runs in a process pool but param "
+                    f"{name!r} of type {type(val).__name__} is not picklable: {e}"
+                ) from None
+        raise TypeError(f"Inputs of action {self._name} are not picklable")
+
+    def _collect(self, result: Any) -> list[tuple[OutputParam, Any]]:
+        """
+        Pair the result with the output params declared at registration. The
+        params are shared, so the only per-call allocation is the list itself.
+        """
+        outputs = self._outputs
+        if not outputs:
+            return []
+        if len(outputs) == 1:
+            return [(outputs[0], result)]
+        return list(zip(outputs, result))
+
+    def _cache_key(self, params_dict: dict[str, Any]) -> str | None:
+        if self._cache is None:
+            return None
+        exclude = self._cache.exclude
+        return fingerprint(
+            self._name, {k: v for k, v in params_dict.items() if k not in exclude}
+        )
+
+    def invoke(self, state: StatefulParamSet) -> list[tuple[OutputParam, Any]]:
+        """
+        Invoke the action synchronously. Coroutine functions, actions using
+        resources and actions with a retry timeout are run on a fresh event
+        loop, use `ainvoke` when a loop is already running.
+        """
+        if self._injected or (self._retry is not None and self._retry.timeout is not None):
+            return asyncio.run(self._ainvoke_releasing(state))
+        if self._streaming:
+            if isasyncgenfunction(self._fn):
+                return asyncio.run(self._drain(state))
+            params_dict = self._resolve(state)
+            return [pair for item in self._fn(**params_dict) for pair in self._collect(item)]
+
+        params_dict = self._resolve(state)
+        key = self._cache_key(params_dict)
+        if key is not None:
+            hit, result = self.cache_store.get(key)
+            if hit:
+                return self._collect(result)
+
+        if self._retry is None and self._limiter is None:
+            result = self._call(params_dict)
         else:
-            p = self._output_params[0]
-            rt.append(
-                (
-                    OutputParam(**p.model_dump(exclude={"type_"}), type_=type(result)),
-                    result,
-                )
+            result = self._call_with_policy(params_dict)
+
+        if key is not None and self._cache is not None:
+            self.cache_store.set(key, result, self._cache.ttl)
+        return self._collect(result)
+
+    async def ainvoke(
+        self, state: StatefulParamSet, executor: Executor | None = None
+    ) -> list[tuple[OutputParam, Any]]:
+        """
+        Invoke the action on the caller's event loop. Coroutine functions are
+        awaited directly. Plain functions are called inline, or off the loop on
+        `executor` (the loop's default executor if None) when the action was
+        declared with executor="thread". Actions declared with
+        executor="process" ship their pickled inputs to `executor`, which
+        should then be a process pool.
+        Generator actions are run to completion and return the outputs of
+        every yield, in order; use `astream` to consume them as they come.
+        """
+        if self._streaming:
+            return await self._drain(state)
+
+        params_dict = self._resolve(state)
+        key = self._cache_key(params_dict)
+        if key is not None:
+            hit, result = self.cache_store.get(key)
+            if hit:
+                return self._collect(result)
+
+        leases = await self._lease() if self._injected else None
+        try:
+            if leases:
+                params_dict = params_dict | {n: inst[0] for n, _, inst in leases}
+            if self._retry is None and self._limiter is None:
+                result = await self._acall(params_dict, executor)
+            else:
+                result = await self._acall_with_policy(params_dict, executor)
+        finally:
+            if leases:
+                await self._release(leases)
+
+        if key is not None and self._cache is not None:
+            self.cache_store.set(key, result, self._cache.ttl)
+        return self._collect(result)
+
+    async def _ainvoke_releasing(self, state: StatefulParamSet) -> list[tuple[OutputParam, Any]]:
+        """`ainvoke` on a loop about to close, with its resource instances."""
+        try:
+            return await self.ainvoke(state)
+        finally:
+            for _, res in self._injected:
+                await res.release_loop()
+
+    async def _lease(self) -> list[tuple[str, Resource[Any], Any]]:
+        """Acquire an instance of each injected resource."""
+        leases: list[tuple[str, Resource[Any], Any]] = []
+        try:
+            for name, res in self._injected:
+                leases.append((name, res, await res.acquire()))
+        except BaseException:
+            await self._release(leases)
+            raise
+        return leases
+
+    @staticmethod
+    async def _release(leases: list[tuple[str, Resource[Any], Any]]) -> None:
+        for _, res, instance in leases:
+            await res.release(instance)
+
+    def _call(self, params_dict: dict[str, Any]) -> Any:
+        if iscoroutinefunction(self._fn):
+            return asyncio.run(self._fn(**params_dict))
+        return self._fn(**params_dict)
+
+    def _call_with_policy(self, params_dict: dict[str, Any]) -> Any:
+        """`_call` with rate limiting and retries (`invoke` runs timeouts through `ainvoke`)."""
+        policy = self._retry or _NO_RETRY
+        attempt = 0
+        while True:
+            if self._limiter is not None:
+                self._limiter.acquire_sync()
+            try:
+                return self._call(params_dict)
+            except policy.retry_on:
+                if attempt >= policy.retries:
+                    raise
+                time.sleep(policy.delay(attempt))
+                attempt += 1
+
+    async def _acall(self, params_dict: dict[str, Any], executor: Executor | None) -> Any:
+        if iscoroutinefunction(self._fn):
+            return await self._fn(**params_dict)
+        if self._executor == "thread":
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, partial(self._fn, **params_dict))
+        if self._executor == "process":
+            loop = asyncio.get_running_loop()
+            data = await loop.run_in_executor(
+                executor,
+                call_in_process,
+                self._fn.__module__,
+                self._fn.__qualname__,
+                self._pickle_inputs(params_dict),
             )
+            return pickle.loads(data)
+        return self._fn(**params_dict)
+
+    async def _acall_with_policy(
+        self, params_dict: dict[str, Any], executor: Executor | None
+    ) -> Any:
+        """`_acall` with rate limiting, a timeout per attempt and retries."""
+        policy = self._retry or _NO_RETRY
+        attempt = 0
+        while True:
+            if self._limiter is not None:
+                await self._limiter.acquire()
+            try:
+                call = self._acall(params_dict, executor)
+                if policy.timeout is None:
+                    return await call
+                return await asyncio.wait_for(call, policy.timeout)
+            except policy.retry_on:
+                if attempt >= policy.retries:
+                    raise
+                await asyncio.sleep(policy.delay(attempt))
+                attempt += 1
+
+    async def astream(
+        self, state: StatefulParamSet
+    ) -> AsyncIterator[list[tuple[OutputParam, Any]]]:
+        """
+        Yield the outputs of each step of a generator action as it is produced.
+        Plain actions yield their outputs once. Sync generators run on the
+        caller's loop, like other inline actions.
+        """
+        if not self._streaming:
+            yield await self.ainvoke(state)
+            return
+        params_dict = self._resolve(state)
+        leases = await self._lease() if self._injected else None
+        try:
+            if leases:
+                params_dict = params_dict | {n: inst[0] for n, _, inst in leases}
+            if isasyncgenfunction(self._fn):
+                async for item in self._fn(**params_dict):
+                    yield self._collect(item)
+            else:
+                for item in self._fn(**params_dict):
+                    yield self._collect(item)
+        finally:
+            if leases:
+                await self._release(leases)
 
-        return rt
+    async def _drain(self, state: StatefulParamSet) -> list[tuple[OutputParam, Any]]:
+        return [pair async for outputs in self.astream(state) for pair in outputs]
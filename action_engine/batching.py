@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from dataclasses import dataclass
+from inspect import isawaitable
+from typing import Awaitable, TYPE_CHECKING
+
+from action_engine.action import Action
+
+if TYPE_CHECKING:
+    from action_engine.engine import Selection
+
+
+class BatchActionSelector[BaseState](ABC):
+    """
+    A selector deciding for many runs at once, e.g. through a batch endpoint
+    or a single forward pass of a local model. Pass an instance as the
+    engine's `base_action_selector` and the engine collects the pending
+    decisions of its concurrent runs into batches.
+    """
+
+    @abstractmethod
+    def select_batch(
+        self, requests: list[tuple[BaseState, list[Action]]]
+    ) -> Sequence[Selection] | Awaitable[Sequence[Selection]]:
+        """Return one selection per `(base_state, candidate_actions)` request, in order."""
+        raise NotImplementedError
+
+
+@dataclass
+class BatchStats:
+    """Occupancy of the batches sent to a BatchActionSelector."""
+
+    max_batch_size: int
+    batches: int = 0
+    requests: int = 0
+    full_batches: int = 0
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.requests / self.batches if self.batches else 0.0
+
+    @property
+    def occupancy(self) -> float:
+        """Mean batch size as a fraction of `max_batch_size`."""
+        return self.mean_batch_size / self.max_batch_size
+
+    def record(self, size: int) -> None:
+        self.batches += 1
+        self.requests += size
+        if size >= self.max_batch_size:
+            self.full_batches += 1
+
+
+type _Pending[BaseState] = tuple[BaseState, list[Action], asyncio.Future[Selection]]
+
+
+class SelectionBatcher[BaseState]:
+    """
+    Collects selection requests on one event loop and sends them to the
+    selector when `max_batch_size` are pending or `window` seconds after the
+    first of them arrived, whichever comes first. Each waiting run gets its
+    own decision back.
+    """
+
+    _pending: list[_Pending[BaseState]]
+    _timer: asyncio.TimerHandle | None
+    _tasks: set[asyncio.Task[None]]
+
+    def __init__(
+        self,
+        selector: BatchActionSelector[BaseState],
+        window: float,
+        max_batch_size: int,
+        stats: BatchStats,
+    ) -> None:
+        self.selector = selector
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.stats = stats
+        self._loop = asyncio.get_running_loop()
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+
+    async def select(self, base_state: BaseState, actions: list[Action]) -> Selection:
+        future: asyncio.Future[Selection] = self._loop.create_future()
+        self._pending.append((base_state, actions, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = self._loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.stats.record(len(batch))
+        task = self._loop.create_task(self._dispatch(batch))
+        # Keep a reference so the task is not garbage collected mid-flight.
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: list[_Pending[BaseState]]) -> None:
+        try:
+            selections = self.selector.select_batch([(b, a) for b, a, _ in batch])
+            if isawaitable(selections):
+                selections = await selections
+            if len(selections) != len(batch):
+                raise ValueError(
+                    f"Batch selector returned {len(selections)} selections "
+                    f"for {len(batch)} requests"
+                )
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), selection in zip(batch, selections):
+            if not future.done():
+                future.set_result(selection)
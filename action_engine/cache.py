@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
+
+
+class CacheStore(ABC):
+    """
+    A key-value store for action results. Implementations count hits and
+    misses so the effect of a cache policy can be observed.
+    """
+
+    hits: int = 0
+    misses: int = 0
+
+    @abstractmethod
+    def get(self, key: str) -> tuple[bool, Any]:
+        """Return (True, value) on a hit and (False, None) on a miss."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float | None) -> None:
+        """Store `value` under `key`, expiring after `ttl` seconds if given."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryCacheStore(CacheStore):
+    """An in-memory LRU store holding at most `maxsize` entries."""
+
+    _entries: OrderedDict[str, tuple[float | None, Any]]
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key: str, value: Any, ttl: float | None) -> None:
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCacheStore(CacheStore):
+    """
+    An LRU store in a local SQLite file, so results survive restarts and can
+    be shared by processes on the same machine. Values must be picklable.
+    """
+
+    def __init__(self, path: str | Path, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache "
+            "(key TEXT PRIMARY KEY, value BLOB, expires REAL, used REAL)"
+        )
+        self._db.commit()
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, expires FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and (row[1] is None or row[1] > now):
+                self._db.execute("UPDATE cache SET used = ? WHERE key = ?", (now, key))
+                self._db.commit()
+                self.hits += 1
+                return True, pickle.loads(row[0])
+            self.misses += 1
+            return False, None
+
+    def set(self, key: str, value: Any, ttl: float | None) -> None:
+        now = time.time()
+        expires = None if ttl is None else now + ttl
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                (key, pickle.dumps(value), expires, now),
+            )
+            self._db.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache "
+                "ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+            self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM cache")
+            self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class CachePolicy(BaseModel):
+    """
+    Caches an action's result keyed by its resolved input values. Params in
+    `exclude` are left out of the key; by default this is the base state,
+    which is shared mutable context rather than an input. When `store` is
+    None each action gets its own MemoryCacheStore of `maxsize` entries.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    ttl: float | None = None
+    maxsize: int = 128
+    store: CacheStore | None = None
+    exclude: list[str] = ["base"]
+
+
+def fingerprint(name: str, params: dict[str, Any]) -> str:
+    """
+    Return a stable hash of `params` for the action `name`. Values must be
+    picklable; equal values that pickle differently (e.g. sets of strings
+    across processes) only cause cache misses.
+    """
+    try:
+        data = pickle.dumps((name, sorted(params.items())))
+    except Exception as e:
+        raise TypeError(
+            f"Inputs of action {name} cannot be fingerprinted: {e}. "
+            f"Add the offending param to the cache policy's exclude list."
+        ) from None
+    return hashlib.sha256(data).hexdigest()
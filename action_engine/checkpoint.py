@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import pickle
+import sqlite3
+import struct
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any
+
+
+@dataclass
+class Snapshot:
+    """
+    The persisted state of a run: its step, every param as (type, value) and
+    whether the run reached a terminal action.
+    """
+
+    step: int
+    params: dict[str, tuple[type, Any]] = field(default_factory=dict)
+    final: bool = False
+
+
+def split_picklable(
+    changed: dict[str, tuple[type, Any]], removed: set[str]
+) -> tuple[dict[str, tuple[bytes, bytes]], set[str]]:
+    """
+    Pickle the type and value of each changed param. Params that cannot be pickled
+    are saved as removed instead, so that a resumed run recomputes them rather
+    than seeing an older value.
+    """
+    pickled = {}
+    removed = set(removed)
+    for name, pair in changed.items():
+        try:
+            pickled[name] = (pickle.dumps(pair[0]), pickle.dumps(pair[1]))
+        except Exception:
+            removed.add(name)
+    return pickled, removed
+
+
+class Checkpointer(ABC):
+    """
+    Persists the param set of runs so they can be resumed. Writes are
+    incremental: `save` receives only the params changed or removed since the
+    previous save of the same run. Params that cannot be pickled are not
+    persisted (see `split_picklable`); a checkpoint never fails the run. The
+    last save of a finished run has `final` set.
+    """
+
+    @abstractmethod
+    def save(
+        self,
+        run_id: str,
+        step: int,
+        changed: dict[str, tuple[type, Any]],
+        removed: set[str],
+        final: bool = False,
+    ) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def load(self, run_id: str) -> Snapshot | None:
+        """Return the latest snapshot of `run_id`, or None if there is none."""
+        raise NotImplementedError
+
+
+_LENGTH = struct.Struct("<I")
+
+
+def frame(data: bytes) -> bytes:
+    """Prefix `data` with its length, for append-only files read by `read_frames`."""
+    return _LENGTH.pack(len(data)) + data
+
+
+def read_frames(f: IO[bytes]) -> Iterator[bytes]:
+    """
+    Yield the records written with `frame`, in order. A record cut off by a
+    crash during the write is ignored.
+    """
+    while True:
+        header = f.read(_LENGTH.size)
+        if len(header) < _LENGTH.size:
+            return
+        (length,) = _LENGTH.unpack(header)
+        data = f.read(length)
+        if len(data) < length:
+            return
+        yield data
+
+
+class PickleCheckpointer(Checkpointer):
+    """
+    Appends one pickled delta per checkpoint to `<directory>/<run_id>.ckpt`,
+    prefixed with its length; loading replays the deltas in order. A delta cut
+    off by a crash is ignored, so the run resumes from the previous one.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, run_id: str) -> Path:
+        return self.directory / f"{run_id}.ckpt"
+
+    def save(
+        self,
+        run_id: str,
+        step: int,
+        changed: dict[str, tuple[type, Any]],
+        removed: set[str],
+        final: bool = False,
+    ) -> None:
+        pickled, removed = split_picklable(changed, removed)
+        data = pickle.dumps((step, pickled, removed, final))
+        with self._lock, open(self._path(run_id), "ab") as f:
+            f.write(frame(data))
+
+    def load(self, run_id: str) -> Snapshot | None:
+        path = self._path(run_id)
+        if not path.exists():
+            return None
+        snapshot = Snapshot(step=0)
+        with open(path, "rb") as f:
+            for data in read_frames(f):
+                step, pickled, removed, final = pickle.loads(data)
+                snapshot.step = step
+                snapshot.final = final
+                for name in removed:
+                    snapshot.params.pop(name, None)
+                for name, (type_, value) in pickled.items():
+                    snapshot.params[name] = (pickle.loads(type_), pickle.loads(value))
+        return snapshot
+
+
+class SqliteCheckpointer(Checkpointer):
+    """Keeps the latest value of every param of every run in one SQLite file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS runs (run_id TEXT PRIMARY KEY, step INTEGER, "
+            "final INTEGER NOT NULL DEFAULT 0);"
+            "CREATE TABLE IF NOT EXISTS params (run_id TEXT, name TEXT, "
+            "type BLOB, value BLOB, PRIMARY KEY (run_id, name));"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(runs)")}
+        if "final" not in columns:  # a file written before runs recorded it
+            with self._db:
+                self._db.execute(
+                    "ALTER TABLE runs ADD COLUMN final INTEGER NOT NULL DEFAULT 0"
+                )
+
+    def save(
+        self,
+        run_id: str,
+        step: int,
+        changed: dict[str, tuple[type, Any]],
+        removed: set[str],
+        final: bool = False,
+    ) -> None:
+        pickled, removed = split_picklable(changed, removed)
+        rows = [(run_id, name, type_, value) for name, (type_, value) in pickled.items()]
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?)", (run_id, step, final)
+            )
+            self._db.executemany(
+                "DELETE FROM params WHERE run_id = ? AND name = ?",
+                [(run_id, name) for name in removed],
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO params VALUES (?, ?, ?, ?)", rows
+            )
+
+    def load(self, run_id: str) -> Snapshot | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT step, final FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            rows = self._db.execute(
+                "SELECT name, type, value FROM params WHERE run_id = ?", (run_id,)
+            ).fetchall()
+        return Snapshot(
+            step=row[0],
+            params={
+                name: (pickle.loads(type_), pickle.loads(value))
+                for name, type_, value in rows
+            },
+            final=bool(row[1]),
+        )
+
+    def close(self) -> None:
+        self._db.close()
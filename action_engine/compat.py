@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from collections.abc import Collection, Iterable, Mapping
+from types import NoneType, UnionType
+from typing import Annotated, Any, Literal, Union, get_args, get_origin
+
+type Validation = Literal["off", "shallow", "deep"]
+
+_table: dict[tuple[Any, Any], bool] = {}
+
+
+def compatible(produced: Any, consumed: Any) -> bool:
+    """
+    Return True if a value of type `produced` can be passed where `consumed`
+    is expected. Results are memoized per (produced, consumed) pair, and
+    identical types short-circuit before the table lookup.
+    """
+    if produced is consumed:
+        return True
+    key = (produced, consumed)
+    try:
+        result = _table.get(key)
+    except TypeError:  # Annotated[...] with unhashable metadata
+        return compatible(_unwrap(produced), _unwrap(consumed))
+    if result is None:
+        result = _table[key] = _compatible(produced, consumed)
+    return result
+
+
+def precompile(pairs: Iterable[tuple[Any, Any]]) -> None:
+    """Fill the table for (produced, consumed) pairs known at registration."""
+    for produced, consumed in pairs:
+        compatible(produced, consumed)
+
+
+def _unwrap(type_: Any) -> Any:
+    while get_origin(type_) is Annotated:
+        type_ = type_.__origin__
+    return type_
+
+
+def _is_union(type_: Any) -> bool:
+    return isinstance(type_, UnionType) or get_origin(type_) is Union
+
+
+def _compatible(produced: Any, consumed: Any) -> bool:
+    produced, consumed = _unwrap(produced), _unwrap(consumed)
+    if produced is consumed or consumed is Any or consumed is object:
+        return True
+    if _is_union(produced):
+        # None is never stored in the state, so `X | None` produces an X.
+        members = [p for p in get_args(produced) if p is not NoneType]
+        return bool(members) and all(compatible(p, consumed) for p in members)
+    if _is_union(consumed):
+        return any(compatible(produced, c) for c in get_args(consumed))
+    produced = get_origin(produced) or produced
+    consumed = get_origin(consumed) or consumed
+    try:
+        return issubclass(produced, consumed)
+    except TypeError:
+        return False
+
+
+def validate(value: Any, type_: Any, mode: Validation = "shallow") -> bool:
+    """
+    Check `value` against `type_`. "shallow" checks the outer type only (the
+    origin of generics, any member of a union), "deep" also checks the items
+    of lists, sets, tuples and dicts, and "off" accepts everything.
+    """
+    if mode == "off" or type(value) is type_:
+        return True
+    if mode == "shallow" and type(type_) is type:
+        return isinstance(value, type_)
+    return _validate(value, _unwrap(type_), mode == "deep")
+
+
+def _validate(value: Any, type_: Any, deep: bool) -> bool:
+    if type_ is Any or type_ is object:
+        return True
+    if _is_union(type_):
+        return any(_validate(value, _unwrap(t), deep) for t in get_args(type_))
+    origin = get_origin(type_)
+    if origin is None:
+        try:
+            return isinstance(value, type_)
+        except TypeError:
+            return True
+    if origin is Literal:
+        return value in get_args(type_)
+    if not isinstance(origin, type):
+        return True
+    if not isinstance(value, origin):
+        return False
+    args = get_args(type_)
+    if not deep or not args:
+        return True
+    if isinstance(value, Mapping) and len(args) == 2:
+        k, v = _unwrap(args[0]), _unwrap(args[1])
+        return all(
+            _validate(key, k, True) and _validate(val, v, True)
+            for key, val in value.items()
+        )
+    if isinstance(value, tuple):
+        if len(args) == 2 and args[1] is Ellipsis:
+            return all(_validate(item, _unwrap(args[0]), True) for item in value)
+        return len(args) == len(value) and all(
+            _validate(item, _unwrap(t), True) for item, t in zip(value, args)
+        )
+    if isinstance(value, Collection) and len(args) == 1:
+        return all(_validate(item, _unwrap(args[0]), True) for item in value)
+    return True
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from typing import Any, Callable, TYPE_CHECKING
+from uuid import uuid4
+
+from action_engine.action import Action
+from action_engine.events import EventSink
+from action_engine.journal import RunJournal
+from action_engine.param import StatefulParamSet, OutputParam
+from action_engine.plan import SlotParamSet
+from action_engine.ready import ReadyIndex
+
+if TYPE_CHECKING:
+    from action_engine.engine import Engine
+
+
+class RunContext[BaseState]:
+    """
+    The mutable state of a single run. The engine only holds the registered
+    actions and their DAG, so any number of contexts can run concurrently
+    against one engine, from asyncio tasks or threads.
+    """
+
+    run_id: str
+    engine: Engine[BaseState]
+    params: StatefulParamSet
+    step: int
+    last_invoked: dict[str, int]
+    _ready: Callable[[], list[Action]]
+    _prune: bool
+    journal: RunJournal | None
+    sink: EventSink | None
+
+    def __init__(self, engine: Engine[BaseState], run_id: str | None = None) -> None:
+        self.run_id = run_id or uuid4().hex
+        self.engine = engine
+        self.step = 0
+        self.last_invoked = {}
+        track_changes = engine.checkpointer is not None
+        self.params: StatefulParamSet
+        if engine.plan is not None:
+            slots = SlotParamSet(engine.plan, engine.validation, track_changes)
+            self.params, self._ready = slots, slots.ready
+        else:
+            index = ReadyIndex(engine.index)
+            self.params = StatefulParamSet(
+                [], index=index, validation=engine.validation, track_changes=track_changes
+            )
+            self._ready = index.ready
+        self._prune = engine.pruner.policy != "off"
+        self.sink = None
+        self.journal = (
+            RunJournal(self.run_id, engine.journal) if engine.journal is not None else None
+        )
+
+    @property
+    def base_state(self) -> BaseState:
+        return self.params.get_state("base")
+
+    def filter_actions(self) -> list[Action]:
+        """
+        Return the actions that can be invoked with the current state, pruned
+        of dead ends according to the engine's pruning policy.
+        """
+        if self._prune:
+            return self.engine.pruner.apply(self._ready(), (p.name for p in self.params))
+        return self._ready()
+
+    def update(self, param: OutputParam, val: Any) -> None:
+        """Update the state with the given parameter and value."""
+        if val is None:
+            pass
+        else:
+            self.params.set_state(param, val)
+            if param.cascade:
+                self.cascade(param.name)
+
+    def cascade(self, name: str) -> None:
+        """Deletes all parameters that depend on the given parameter name recursively."""
+        if cascade := self.engine.cascades.get(name):
+            if not self.engine.tracing:
+                self.params.discard_all(cascade)
+                return
+            with self.engine.trace("cascade", self) as span:
+                span.set("param", name)
+                self.params.discard_all(cascade)
+
+    def checkpoint(self, final: bool = False) -> None:
+        """
+        Save the params changed since the previous checkpoint, `final` once a
+        terminal action ran. The base state is excluded: it holds clients and
+        is passed in again on resume.
+        """
+        checkpointer = self.engine.checkpointer
+        assert checkpointer is not None
+        changed, removed = self.params.take_changes()
+        changed.discard("base")
+        values = {name: self.params.get_state(name) for name in changed}
+        checkpointer.save(
+            self.run_id,
+            self.step,
+            {name: (type(val), val) for name, val in values.items()},
+            removed,
+            final,
+        )
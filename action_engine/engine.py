@@ -1,112 +1,885 @@
 from __future__ import annotations
 
+import asyncio
 import base64
-from typing import Callable, Concatenate, Any
+import weakref
+from inspect import isawaitable
+from collections.abc import AsyncIterator, Sequence
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Callable, Concatenate, cast
 
 from action_engine.action import Action
+from action_engine.batching import BatchActionSelector, BatchStats, SelectionBatcher
+from action_engine.cache import CachePolicy
+from action_engine.checkpoint import Checkpointer
+from action_engine.compat import Validation, precompile
+from action_engine.context import RunContext
+from action_engine.events import CompleteEvent, OutputEvent, RunEvent, StepEvent
+from action_engine.executors import BoundedThreadPool, ProcessPool
 from action_engine.graph import Graph
-from action_engine.param import StatefulParamSet, Param, OutputParam
+from action_engine.journal import JournalStore, RunJournal, input_fingerprint
+from action_engine.param import Param, OutputParam
+from action_engine.plan import Plan
+from action_engine.pruning import DeadEndPruner, Pruning
+from action_engine.ranking import Ranker
+from action_engine.retry import RateLimiter, RetryPolicy
+from action_engine.ready import ActionIndex
+from action_engine.resources import Resource
+from action_engine.tracing import Listener, Phase, Span, NULL_SPAN
+from action_engine.types import ExecutorKind
+
+
+type Selection = Action | Sequence[Action]
+type ActionSelector[BaseState] = Callable[
+    [BaseState, list[Action]], Selection | Awaitable[Selection]
+]
 
 
 class Engine[BaseState]:
-    _params: StatefulParamSet
+    """
+    A registry of actions and their DAG. Per-run state lives in a RunContext,
+    so one engine can serve many concurrent runs.
+    """
+
+    _index: ActionIndex
+    _max_workers: int | None
+    _thread_pool: BoundedThreadPool | None
+    _process_pool: ProcessPool | None
+    _validation: Validation
+    _listeners: list[Listener]
+    _checkpointer: Checkpointer | None
+    _checkpoint_every: int
+    _journal: JournalStore | None
+    _plan: Plan | None
+    _pruner: DeadEndPruner
+    _ranker: Ranker | None
+    _rate_limits: dict[str, RateLimiter]
+    _resources: dict[str, Resource[Any]]
+    _max_speculative: int
+    _speculative: bool
+    _batch_selector: BatchActionSelector[BaseState] | None
+    _batch_window: float
+    _batch_stats: BatchStats
+    _batchers: weakref.WeakKeyDictionary[
+        asyncio.AbstractEventLoop, SelectionBatcher[BaseState]
+    ]
+    _dep_decls: dict[str, dict[str, tuple[str, ...]]]
+    _deps: dict[str, list[str]]
+    _dep_parents: dict[str, set[str]]
+    _cascades: dict[str, tuple[str, ...]]
     actions: dict[str, Action]
     base_state_type: type[BaseState]
-    base_action_selector: Callable[[BaseState, list[Action]], Action]
+    base_action_selector: ActionSelector[BaseState] | BatchActionSelector[BaseState]
 
     def __init__(
         self,
         base_state_type: type[BaseState],
-        base_action_selector: Callable[[BaseState, list[Action]], Action],
+        base_action_selector: ActionSelector[BaseState] | BatchActionSelector[BaseState],
+        max_workers: int | None = None,
+        process_pool: ProcessPool | None = None,
+        validation: Validation = "shallow",
+        checkpointer: Checkpointer | None = None,
+        checkpoint_every: int = 1,
+        journal: JournalStore | None = None,
+        batch_window: float = 0.005,
+        max_batch_size: int = 32,
+        max_speculative: int = 4,
+        pruning: Pruning = "off",
+        ranker: Ranker | None = None,
+        rate_limits: dict[str, RateLimiter] | None = None,
     ):
-        self._params = StatefulParamSet([])
+        """
+        `max_workers` bounds the thread pool shared by every action declared
+        with executor="thread". It defaults to ThreadPoolExecutor's default.
+        `process_pool` runs actions declared with executor="process"; a default
+        ProcessPool is created on first use if none is given.
+        `validation` sets how strictly values are checked against the declared
+        type of the param they are written through: "off", "shallow" (outer
+        type only) or "deep" (also the items of collections).
+        With a `checkpointer`, every run saves the params changed since its
+        previous checkpoint every `checkpoint_every` steps and when it ends.
+        With a `journal`, every run records its selector decisions and action
+        outputs so it can be replayed with `replay`.
+        If `base_action_selector` is a BatchActionSelector, the pending
+        selections of concurrent runs on the same event loop are sent to it in
+        batches of up to `max_batch_size`, waiting at most `batch_window`
+        seconds for a batch to fill up.
+        Up to `max_speculative` ready actions declared with speculative=True
+        are started while the selector decides, see `action`.
+        `pruning` decides what happens to ready actions that can no longer
+        lead to a terminal action: kept ("off"), dropped ("filter") or moved
+        after the others ("rank"). See DeadEndPruner.
+        A `ranker` orders the candidates and passes only its top k to the
+        selector.
+        `rate_limits` maps names to the RateLimiter shared by every action
+        declared with that `rate_limit`.
+        """
+        self._index = ActionIndex()
+        self._max_workers = max_workers
+        self._thread_pool = None
+        self._process_pool = process_pool
+        self._validation = validation
+        self._listeners = []
+        self._checkpointer = checkpointer
+        self._checkpoint_every = checkpoint_every
+        self._journal = journal
+        self._plan = None
+        self._pruner = DeadEndPruner(self._index, pruning)
+        self._ranker = ranker
+        self._rate_limits = dict(rate_limits or {})
+        self._resources = {}
+        self._max_speculative = max_speculative
+        self._speculative = False
+        self._batch_selector = (
+            base_action_selector
+            if isinstance(base_action_selector, BatchActionSelector)
+            else None
+        )
+        self._batch_window = batch_window
+        self._batch_stats = BatchStats(max_batch_size)
+        self._batchers = weakref.WeakKeyDictionary()
+        self._dep_decls = {}
+        self._deps = {}
+        self._dep_parents = {}
+        self._cascades = {}
         self.actions = {}
         self.base_state_type = base_state_type
         self.base_action_selector = base_action_selector
         self.dag = Graph[Action, str]()
 
+    @property
+    def index(self) -> ActionIndex:
+        return self._index
+
+    @property
+    def validation(self) -> Validation:
+        return self._validation
+
+    @property
+    def checkpointer(self) -> Checkpointer | None:
+        return self._checkpointer
+
+    @property
+    def plan(self) -> Plan | None:
+        """The plan built by `compile`, or None if the engine is not compiled."""
+        return self._plan
+
+    def compile(self) -> Plan:
+        """
+        Freeze the registry into a Plan. Runs started afterwards keep their
+        params in a slot table and check readiness with bit operations.
+        Registering actions on a compiled engine raises RuntimeError.
+        """
+        if self._plan is None:
+            self._plan = Plan(list(self.actions.values()), self._cascades)
+        return self._plan
+
+    @property
+    def pruner(self) -> DeadEndPruner:
+        return self._pruner
+
+    @property
+    def ranker(self) -> Ranker | None:
+        return self._ranker
+
+    @property
+    def journal(self) -> JournalStore | None:
+        return self._journal
+
+    @property
+    def batch_stats(self) -> BatchStats:
+        """Batch occupancy of the BatchActionSelector, across all event loops."""
+        return self._batch_stats
+
+    @property
+    def cascades(self) -> dict[str, tuple[str, ...]]:
+        return self._cascades
+
+    @property
+    def thread_pool(self) -> BoundedThreadPool:
+        """The pool running executor="thread" actions, created on first use."""
+        if self._thread_pool is None:
+            self._thread_pool = BoundedThreadPool(self._max_workers)
+        return self._thread_pool
+
+    @property
+    def process_pool(self) -> ProcessPool:
+        """The pool running executor="process" actions, created on first use."""
+        if self._process_pool is None:
+            self._process_pool = ProcessPool()
+        return self._process_pool
+
+    @property
+    def resources(self) -> dict[str, Resource[Any]]:
+        return self._resources
+
+    def resource[T](
+        self, name: str | None = None, max_size: int = 1
+    ) -> Callable[[Callable[[], T]], Resource[T]]:
+        """
+        Declare a resource shared by every run, e.g. an API client. The
+        decorated function creates an instance; if it is an (async) generator,
+        the code after its yield tears the instance down. At most `max_size`
+        instances exist at a time.
+        Actions registered afterwards get an instance injected into each param
+        named after the resource (the function name unless `name` is given) or
+        annotated with exactly its class, instead of reading it from the run's
+        params. Builtin classes such as str are only matched by name.
+        Instances of async resources are bound to their event loop, see
+        Resource.
+        """
+
+        def wrapper(fn: Callable[[], T]) -> Resource[T]:
+            res = Resource[T](fn, name, max_size)
+            if res.name in self._resources:
+                raise ValueError(f"Resource {res.name!r} is already declared")
+            self._resources[res.name] = res
+            return res
+
+        return wrapper
+
+    async def ashutdown(self, wait: bool = True) -> None:
+        """`shutdown` for callers already on an event loop."""
+        for res in self._resources.values():
+            await res.aclose()
+        self._shutdown_pools(wait)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shut down the worker pools and tear down the resources. The pools are
+        recreated if the engine runs again, the resources are not. Use
+        `ashutdown` from a running event loop.
+        """
+        if self._resources:
+            asyncio.run(self.ashutdown(wait))
+        else:
+            self._shutdown_pools(wait)
+
+    def _shutdown_pools(self, wait: bool) -> None:
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=wait)
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=wait)
+            self._process_pool = None
+
+    def _executor_for(self, action: Action) -> Executor | None:
+        if action.executor == "thread":
+            return self.thread_pool
+        if action.executor == "process":
+            return self.process_pool
+        return None
+
+    def add_listener(self, listener: Listener) -> None:
+        """
+        Subscribe to the TraceEvents of every run: one per step, filter,
+        rank, select, invoke, update and cascade phase, and one per finished
+        run.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Listener) -> None:
+        self._listeners.remove(listener)
+
+    @property
+    def tracing(self) -> bool:
+        """True if any listener is subscribed."""
+        return bool(self._listeners)
+
+    def trace(
+        self, phase: Phase, ctx: RunContext[BaseState], action: str | None = None
+    ) -> Span:
+        """Return a span timing `phase` of `ctx`, or a no-op span if nobody listens."""
+        if not self._listeners:
+            return NULL_SPAN
+        return Span(self._listeners, phase, ctx.run_id, ctx.step, action)
+
+    def create_context(self, run_id: str | None = None) -> RunContext[BaseState]:
+        """Create a fresh, empty context for a new run."""
+        return RunContext(self, run_id)
+
     def run[**P, O](
         self,
         base_state: BaseState,
         entry_point: Action[Concatenate[BaseState, P], O] | None = None,
         *args: P.args,
         **kwargs: P.kwargs,
-    ) -> None:
-        self._params.set_state(
-            Param(name="base", type_=self.base_state_type), base_state
+    ) -> RunContext[BaseState]:
+        """
+        Run the engine until a terminal action is invoked. This is a thin
+        wrapper that drives `arun` on a new event loop, use `arun` directly
+        when a loop is already running.
+        """
+        return self._run_sync(self.arun(base_state, entry_point, *args, **kwargs))
+
+    def _run_sync[T](self, main: Awaitable[T]) -> T:
+        """
+        Drive `main` on a new event loop, tearing down the instances of async
+        resources bound to that loop before it closes.
+        """
+
+        async def run() -> T:
+            try:
+                return await main
+            finally:
+                for res in self._resources.values():
+                    await res.release_loop()
+
+        return asyncio.run(run())
+
+    async def arun[**P, O](
+        self,
+        base_state: BaseState,
+        entry_point: Action[Concatenate[BaseState, P], O] | None = None,
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> RunContext[BaseState]:
+        """
+        Run the engine on the caller's event loop until a terminal action is
+        invoked. Async actions and selectors are awaited on that loop.
+        Every call gets its own RunContext, which is returned when the run ends.
+        """
+        ctx = self.create_context()
+        await self._start(ctx, base_state, entry_point, args, kwargs)
+        return ctx
+
+    async def astream[**P, O](
+        self,
+        base_state: BaseState,
+        entry_point: Action[Concatenate[BaseState, P], O] | None = None,
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> AsyncIterator[RunEvent]:
+        """
+        Run like `arun`, yielding a StepEvent per step, an OutputEvent per
+        output written to the state (one per yield for generator actions) and
+        a final CompleteEvent holding the context. The run proceeds in a task
+        of its own; closing the iterator early cancels it.
+        """
+        queue: asyncio.Queue[RunEvent | None] = asyncio.Queue()
+        ctx = self.create_context()
+        ctx.sink = queue.put_nowait
+        task = asyncio.ensure_future(
+            self._start(ctx, base_state, entry_point, args, kwargs)
+        )
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (event := await queue.get()) is not None:
+                yield event
+            await task
+            yield CompleteEvent(ctx.run_id, ctx.step, ctx)
+        finally:
+            task.cancel()
+
+    def replay[**P, O](
+        self,
+        run_id: str,
+        base_state: BaseState,
+        entry_point: Action[Concatenate[BaseState, P], O] | None = None,
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> RunContext[BaseState]:
+        """Synchronous wrapper of `areplay`."""
+        return self._run_sync(
+            self.areplay(run_id, base_state, entry_point, *args, **kwargs)
         )
 
-        if entry_point:
-            # Set the initial states for positional arguments
-            for p, arg in zip(entry_point.input_params, args):
-                self._params.set_state(Param(name=p.name, type_=p.type_), arg)
+    async def areplay[**P, O](
+        self,
+        run_id: str,
+        base_state: BaseState,
+        entry_point: Action[Concatenate[BaseState, P], O] | None = None,
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> RunContext[BaseState]:
+        """
+        Re-run the journaled run `run_id` as a new run. Selector decisions and
+        action outputs come from the journal, without calling the selector or
+        the actions, as long as the run follows it: a selected action that is
+        not ready, or an action whose inputs differ from the recording, makes
+        the run diverge and continue live from that step on.
+        `ctx.journal.diverged_at` tells where, or is None if it never did.
+        """
+        if self._journal is None:
+            raise ValueError("Engine has no journal to replay from")
+        entries = self._journal.load(run_id)
+        ctx = self.create_context()
+        ctx.journal = RunJournal(ctx.run_id, self._journal, entries)
+        await self._start(ctx, base_state, entry_point, args, kwargs)
+        return ctx
+
+    async def _start(
+        self,
+        ctx: RunContext[BaseState],
+        base_state: BaseState,
+        entry_point: Action | None,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> None:
+        """Set up `ctx`, invoke the entry point and run the loop to the end."""
+        with self.trace("run", ctx) as run_span:
+            ctx.params.set_state(Param.of("base", self.base_state_type), base_state)
+
+            if entry_point:
+                # Set the initial states for positional arguments
+                for p, arg in zip(entry_point.input_params, args):
+                    ctx.params.set_state(p, arg)
 
-            # Set the initial states for keyword arguments
-            for name, val in kwargs.items():
-                param = entry_point.get_input_param(name)
-                assert param
-                self._params.set_state(Param(name=param.name, type_=param.type_), val)
+                # Set the initial states for keyword arguments
+                for name, val in kwargs.items():
+                    param = entry_point.get_input_param(name)
+                    assert param
+                    ctx.params.set_state(param, val)
 
-            # Invoke the entry point
-            result = entry_point.invoke(self._params)
-            for param2, val in result:
-                self._update(param2, val)
+                # Invoke the entry point
+                if ctx.sink is not None:
+                    ctx.sink(StepEvent(ctx.run_id, ctx.step, [entry_point.name]))
+                if ctx.journal is not None:
+                    ctx.journal.begin(ctx.step, [entry_point])
+                result = await self._ainvoke(ctx, entry_point)
+                self._update(ctx, entry_point, result)
+                if ctx.journal is not None:
+                    ctx.journal.end()
 
+            await self._loop(ctx)
+            run_span.set("steps", ctx.step)
+
+    def resume(self, run_id: str, base_state: BaseState) -> RunContext[BaseState]:
+        """Synchronous wrapper of `aresume`."""
+        return self._run_sync(self.aresume(run_id, base_state))
+
+    async def aresume(
+        self, run_id: str, base_state: BaseState
+    ) -> RunContext[BaseState]:
+        """
+        Continue run `run_id` from its latest checkpoint. The base state is
+        not checkpointed, so it is passed in again. A run that already finished
+        is not stepped again: the returned context only holds its final params.
+        """
+        if self._checkpointer is None:
+            raise ValueError("Engine has no checkpointer to resume from")
+        snapshot = self._checkpointer.load(run_id)
+        if snapshot is None:
+            raise KeyError(f"No checkpoint for run {run_id}")
+
+        ctx = self.create_context(run_id)
+        ctx.step = snapshot.step
+        with self.trace("run", ctx) as run_span:
+            run_span.set("resumed_from", snapshot.step)
+            ctx.params.set_state(Param.of("base", self.base_state_type), base_state)
+            for name, (type_, val) in snapshot.params.items():
+                ctx.params.set_state(Param.of(name, type_), val)
+            # The restored params are already persisted.
+            ctx.params.take_changes()
+
+            if not snapshot.final:
+                await self._loop(ctx)
+            run_span.set("steps", ctx.step)
+            return ctx
+
+    async def _loop(self, ctx: RunContext[BaseState]) -> None:
+        """Step `ctx` until a terminal action has been invoked."""
+        checkpointer, every = self._checkpointer, self._checkpoint_every
         while True:
-            possible_actions = self._filter_actions()
-            action = self.base_action_selector(self._params.get_state('base') ,possible_actions)
-            output_params = action.invoke(self._params)
-            for param3, val in output_params:
-                self._update(param3, val)
-            if action.final:
+            ctx.step += 1
+            if self._listeners:
+                final = await self._traced_step(ctx)
+            elif self._speculative:
+                final = await self._speculative_step(ctx)
+            else:
+                possible_actions = ctx.filter_actions()
+                selection = await self._select(ctx, possible_actions)
+                final = await self._invoke(ctx, selection)
+            if ctx.journal is not None:
+                ctx.journal.end()
+            if checkpointer is not None and (final or ctx.step % every == 0):
+                ctx.checkpoint(final)
+            if final:
+                return
+
+    async def _traced_step(self, ctx: RunContext[BaseState]) -> bool:
+        """One step of the run loop, with every phase wrapped in a span."""
+        with self.trace("step", ctx):
+            with self.trace("filter", ctx) as span:
+                possible_actions = ctx.filter_actions()
+                span.set("candidates", len(possible_actions))
+            speculated = self._speculate(ctx, possible_actions)
+            try:
+                with self.trace("select", ctx) as span:
+                    if speculated:
+                        span.set("speculated", len(speculated))
+                    selection = await self._select(ctx, possible_actions)
+                return await self._invoke(ctx, selection, speculated)
+            finally:
+                self._cancel(speculated)
+
+    async def _speculative_step(self, ctx: RunContext[BaseState]) -> bool:
+        """One step of the run loop, invoking speculative actions during selection."""
+        possible_actions = ctx.filter_actions()
+        speculated = self._speculate(ctx, possible_actions)
+        try:
+            selection = await self._select(ctx, possible_actions)
+            return await self._invoke(ctx, selection, speculated)
+        finally:
+            self._cancel(speculated)
+
+    def _speculate(
+        self, ctx: RunContext[BaseState], possible_actions: list[Action]
+    ) -> dict[Action, asyncio.Task[list[tuple[OutputParam, Any]]]]:
+        """
+        Start the ready speculative actions, up to `max_speculative`, so they
+        run while the selector decides. Journaled runs do not speculate, since
+        their invocations have to be recorded or replayed in selection order.
+        """
+        speculated: dict[Action, asyncio.Task[list[tuple[OutputParam, Any]]]] = {}
+        if not self._speculative or ctx.journal is not None:
+            return speculated
+        for action in possible_actions:
+            if len(speculated) >= self._max_speculative:
                 break
+            if action.speculative:
+                speculated[action] = asyncio.ensure_future(
+                    action.ainvoke(ctx.params, self._executor_for(action))
+                )
+        return speculated
+
+    @staticmethod
+    def _cancel(
+        speculated: dict[Action, asyncio.Task[list[tuple[OutputParam, Any]]]],
+    ) -> None:
+        """Cancel the speculative invocations whose results were not used."""
+        for task in speculated.values():
+            task.cancel()
+            # Mark a failure as retrieved, it is irrelevant if not selected.
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
 
-    def _filter_actions(self) -> list[Action]:
-        return [
-            action
-            for action in self.actions.values()
-            if action.can_invoke_with(self._params)
-        ]
-
-    def _update(self, param: OutputParam, val: Any) -> None:
-        """Update the state with the given parameter and value."""
-        if val is None:
-            pass
+    async def _select(
+        self, ctx: RunContext[BaseState], possible_actions: list[Action]
+    ) -> Selection:
+        """
+        Ask the selector for the next action(s), awaiting it if it is async.
+        With a ranker, the selector only sees the ranker's top candidates.
+        """
+        journal = ctx.journal
+        if journal is not None:
+            replayed = journal.select(ctx.step, possible_actions)
+            if replayed is not None:
+                journal.begin(ctx.step, replayed)
+                return replayed
+        if self._ranker is not None:
+            with self.trace("rank", ctx) as span:
+                possible_actions = self._ranker.rank(ctx, possible_actions)
+                span.set("candidates", len(possible_actions))
+        selection: Selection
+        if self._batch_selector is not None:
+            selection = await self._batcher().select(ctx.base_state, possible_actions)
         else:
-            self._params.set_state(Param(name=param.name, type_=param.type_), val)
-            if param.cascade:
-                self._cascade(param.name)
-
-    def _cascade(self, name: str) -> None:
-        """Deletes all parameters that depend on the given parameter name recursively."""
-        for action in self.actions.values():
-            if deps := action.input_params.get(name):
-                for dep in deps.deps:
-                    self._params.discard(dep)
-                    self._cascade(dep)
+            selector = cast(ActionSelector[BaseState], self.base_action_selector)
+            result = selector(ctx.base_state, possible_actions)
+            selection = await result if isawaitable(result) else result
+        if journal is not None:
+            journal.begin(
+                ctx.step, [selection] if isinstance(selection, Action) else list(selection)
+            )
+        return selection
+
+    def _batcher(self) -> SelectionBatcher[BaseState]:
+        """The batcher of the running event loop, created on first use."""
+        assert self._batch_selector is not None
+        loop = asyncio.get_running_loop()
+        batcher = self._batchers.get(loop)
+        if batcher is None:
+            batcher = SelectionBatcher(
+                self._batch_selector,
+                self._batch_window,
+                self._batch_stats.max_batch_size,
+                self._batch_stats,
+            )
+            self._batchers[loop] = batcher
+        return batcher
+
+    async def _invoke(
+        self,
+        ctx: RunContext[BaseState],
+        selection: Selection,
+        speculated: dict[Action, asyncio.Task[list[tuple[OutputParam, Any]]]] | None = None,
+    ) -> bool:
+        """
+        Invoke the selected action(s) and merge their outputs into the state.
+        Independent actions run concurrently, conflicting ones run in selection
+        order, and outputs are applied in selection order. Returns True if any
+        of the actions is terminal.
+        Selected actions of the first wave adopt their `speculated` invocation
+        (which is removed from it); later waves may read outputs of earlier
+        ones, so they are always invoked afresh.
+        """
+        if isinstance(selection, Action):
+            selection = [selection]
+        if ctx.sink is not None:
+            ctx.sink(StepEvent(ctx.run_id, ctx.step, [a.name for a in selection]))
+
+        final = False
+        for wave in self.partition(selection):
+            if len(wave) == 1:
+                results = [await self._ainvoke(ctx, wave[0], speculated)]
+            else:
+                results = await asyncio.gather(
+                    *(self._ainvoke(ctx, a, speculated) for a in wave)
+                )
+            speculated = None
+            for action, output_params in zip(wave, results):
+                self._update(ctx, action, output_params)
+                ctx.last_invoked[action.name] = ctx.step
+                final = final or action.final
+        return final
+
+    def _ainvoke(
+        self,
+        ctx: RunContext[BaseState],
+        action: Action,
+        speculated: dict[Action, asyncio.Task[list[tuple[OutputParam, Any]]]] | None = None,
+    ) -> Awaitable[list[tuple[OutputParam, Any]]]:
+        invocation: Awaitable[list[tuple[OutputParam, Any]]]
+        if speculated and action in speculated:
+            invocation = speculated.pop(action)
+        elif ctx.journal is not None:
+            # Traces its live invocations itself
+            invocation = self._journaled_invoke(ctx, ctx.journal, action)
+        elif action.streaming:
+            invocation = self._stream(ctx, action)
+        else:
+            invocation = action.ainvoke(ctx.params, self._executor_for(action))
+        if self._listeners and ctx.journal is None:
+            invocation = self._traced_invoke(ctx, action, invocation)
+        if self._ranker is not None:
+            invocation = self._ranker.observe(ctx, action, invocation)
+        return invocation
+
+    async def _traced_invoke(
+        self,
+        ctx: RunContext[BaseState],
+        action: Action,
+        invocation: Awaitable[list[tuple[OutputParam, Any]]],
+    ) -> list[tuple[OutputParam, Any]]:
+        with self.trace("invoke", ctx, action.name):
+            return await invocation
+
+    async def _stream(
+        self, ctx: RunContext[BaseState], action: Action
+    ) -> list[tuple[OutputParam, Any]]:
+        """
+        Apply the outputs of each yield of a generator action as they arrive.
+        Nothing is left for the caller to apply.
+        """
+        async for outputs in action.astream(ctx.params):
+            self._update(ctx, action, outputs)
+        return []
+
+    async def _journaled_invoke(
+        self, ctx: RunContext[BaseState], journal: RunJournal, action: Action
+    ) -> list[tuple[OutputParam, Any]]:
+        """Invoke `action`, or take its outputs from the journal when replaying."""
+        inputs = input_fingerprint(action, action._resolve(ctx.params))
+        outputs = journal.outputs(ctx.step, action, inputs)
+        if outputs is None:
+            invocation = action.ainvoke(ctx.params, self._executor_for(action))
+            if self._listeners:
+                outputs = await self._traced_invoke(ctx, action, invocation)
+            else:
+                outputs = await invocation
+        journal.record(action, inputs, outputs)
+        return outputs
+
+    def _update(
+        self,
+        ctx: RunContext[BaseState],
+        action: Action,
+        output_params: list[tuple[OutputParam, Any]],
+    ) -> None:
+        if ctx.sink is not None:
+            for param, val in output_params:
+                if val is not None:
+                    ctx.sink(OutputEvent(ctx.run_id, ctx.step, action.name, param.name, val))
+        if not self._listeners:
+            for param, val in output_params:
+                ctx.update(param, val)
+            return
+        with self.trace("update", ctx, action.name):
+            for param, val in output_params:
+                ctx.update(param, val)
+
+    @staticmethod
+    def conflicts(a: Action, b: Action) -> bool:
+        """
+        Two actions conflict if one writes a param that the other reads or
+        writes, i.e. they are adjacent in the DAG or share an output.
+        """
+        if a is b:
+            return True
+        a_out, b_out = a.output_params, b.output_params
+        return any(p.name in b.input_params or p.name in b_out for p in a_out) or any(
+            p.name in a.input_params for p in b_out
+        )
+
+    def partition(self, actions: Sequence[Action]) -> list[list[Action]]:
+        """
+        Split `actions` into waves of mutually non-conflicting actions. Each
+        action is placed in the first wave after every earlier action it
+        conflicts with, so conflicting actions keep their relative order.
+        """
+        waves: list[list[Action]] = []
+        for action in actions:
+            i = 0
+            for j in range(len(waves) - 1, -1, -1):
+                if any(self.conflicts(action, other) for other in waves[j]):
+                    i = j + 1
+                    break
+            if i == len(waves):
+                waves.append([])
+            waves[i].append(action)
+        return waves
+
+    def _update_deps(self, action: Action, replaced: Action | None) -> None:
+        """
+        Fold the Deps declarations of `action`, replacing those of the action
+        it re-registers, into the cascade closures. Only the closures that can
+        reach a param whose declarations changed are recomputed, in the order
+        a recursive cascade would visit them. Raises ValueError on a cycle,
+        leaving the engine unchanged.
+        """
+        declared = {p.name: tuple(p.deps) for p in action.input_params if p.deps}
+        dropped = (
+            {p.name for p in replaced.input_params if p.deps} if replaced is not None else set()
+        )
+        if not declared and not dropped:
+            return
+
+        decls: dict[str, dict[str, tuple[str, ...]]] = {}
+        changed: dict[str, list[str]] = {}
+        for name in dropped | declared.keys():
+            by_action = dict(self._dep_decls.get(name, {}))
+            by_action.pop(action.name, None)
+            if name in declared:
+                by_action[action.name] = declared[name]
+            decls[name] = by_action
+            merged: list[str] = []
+            for ds in by_action.values():
+                merged.extend(d for d in ds if d not in merged)
+            if merged != self._deps.get(name, []):
+                changed[name] = merged
+
+        # Only the closures of params that reach a changed one are stale
+        affected = set(changed)
+        stack = list(changed)
+        while stack:
+            for parent in self._dep_parents.get(stack.pop(), ()):
+                if parent not in affected:
+                    affected.add(parent)
+                    stack.append(parent)
+
+        closures: dict[str, tuple[str, ...]] = {}
+        visiting: list[str] = []
+
+        def close(name: str) -> tuple[str, ...]:
+            if name not in affected:
+                return self._cascades.get(name, ())
+            if name in closures:
+                return closures[name]
+            if name in visiting:
+                cycle = visiting[visiting.index(name) :] + [name]
+                raise ValueError("Cyclic Deps declaration: " + " -> ".join(cycle))
+            visiting.append(name)
+            order: dict[str, None] = {}
+            deps = changed[name] if name in changed else self._deps.get(name, ())
+            for dep in deps:
+                order[dep] = None
+                order.update(dict.fromkeys(close(dep)))
+            visiting.pop()
+            closures[name] = tuple(order)
+            return closures[name]
+
+        updated = {name: close(name) for name in affected}
+
+        for name, by_action in decls.items():
+            if by_action:
+                self._dep_decls[name] = by_action
+            else:
+                self._dep_decls.pop(name, None)
+        for name, merged in changed.items():
+            for dep in self._deps.pop(name, ()):
+                self._dep_parents[dep].discard(name)
+            if merged:
+                self._deps[name] = merged
+                for dep in merged:
+                    self._dep_parents.setdefault(dep, set()).add(name)
+        for name, closure in updated.items():
+            if closure:
+                self._cascades[name] = closure
+            else:
+                self._cascades.pop(name, None)
 
     def action[**P, O](
-        self, terminal: bool = False, description: str = ""
+        self,
+        terminal: bool = False,
+        description: str = "",
+        executor: ExecutorKind = "inline",
+        cache: CachePolicy | None = None,
+        speculative: bool = False,
+        retry: RetryPolicy | None = None,
+        rate_limit: str | None = None,
     ) -> Callable[
         [Callable[Concatenate[BaseState, P], O]], Action[Concatenate[BaseState, P], O]
     ]:
+        """
+        Register a function as an action. `speculative=True` declares it free
+        of side effects: while the selector decides, the engine may already
+        invoke it and drop the result if it is not selected.
+        `retry` bounds and retries its calls; a plain function with a retry
+        timeout runs on the thread pool so that the timeout can fire. `rate_limit`
+        names the entry of the engine's `rate_limits` that every call (and
+        retry) waits on.
+        """
+        if rate_limit is not None and rate_limit not in self._rate_limits:
+            raise ValueError(f"No rate limit configured for {rate_limit!r}")
+
         def wrapper(
             fn: Callable[Concatenate[BaseState, P], O],
         ) -> Action[Concatenate[BaseState, P], O]:
-            action = Action(fn=fn, final=terminal, description=description)
+            if self._plan is not None:
+                raise RuntimeError(
+                    f"Cannot register action {fn.__name__}: the engine is compiled"
+                )
+            action = Action(
+                fn=fn,
+                final=terminal,
+                description=description,
+                executor=executor,
+                cache=cache,
+                speculative=speculative,
+                retry=retry,
+                limiter=self._rate_limits.get(rate_limit) if rate_limit else None,
+                resources=self._resources,
+            )
+            replaced = self.actions.get(action.name)
+            self._update_deps(action, replaced)
+
+            if replaced is not None:
+                self.dag.remove_node(replaced)
             self.actions[action.name] = action
+            self._index.register(action)
+            self._pruner.clear()
+            self._speculative = self._speculative or action.speculative
 
-            # update existing nodes in dag
-            for n, a in self.actions.items():
-                for p in action.output_params:
-                    if p.name in a.input_params:
-                        self.dag.add_edge(action, a, p.name)
-
-            # add new node to dag
-            for n, a in self.actions.items():
-                for p in a.output_params:
-                    if p.name in action.input_params:
-                        self.dag.add_edge(a, action, p.name)
+            # Connect the new node through the producer and consumer indexes
+            self.dag.add_node(action)
+            for p in action.output_params:
+                for a in self._index.consumers.get(p.name, ()):
+                    self.dag.add_edge(action, a, p.name)
+                    precompile([(p.type_, a.input_params.params[p.name].type_)])
+            for ip in action.input_params:
+                for a in self._index.producers.get(ip.name, ()):
+                    self.dag.add_edge(a, action, ip.name)
+                    precompile([(a.output_params.params[ip.name].type_, ip.type_)])
             return action
 
         return wrapper
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from action_engine.context import RunContext
+
+
+@dataclass(frozen=True, slots=True)
+class StepEvent:
+    """A step started with the given selected actions; step 0 is the entry point."""
+
+    run_id: str
+    step: int
+    actions: list[str]
+
+
+@dataclass(frozen=True, slots=True)
+class OutputEvent:
+    """An action wrote `value` to `param`. Generator actions emit one per yield."""
+
+    run_id: str
+    step: int
+    action: str
+    param: str
+    value: Any
+
+
+@dataclass(frozen=True, slots=True)
+class CompleteEvent:
+    """The run invoked a terminal action and ended after `step` steps."""
+
+    run_id: str
+    step: int
+    context: RunContext[Any]
+
+
+type RunEvent = StepEvent | OutputEvent | CompleteEvent
+type EventSink = Callable[[RunEvent], None]
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import importlib
+import os
+import pickle
+import threading
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait as wait_all,
+)
+from multiprocessing.context import BaseContext
+from typing import Callable, Any
+
+
+class BoundedThreadPool(Executor):
+    """
+    A fixed-size thread pool that reports how many calls are waiting for a
+    worker. Blocking sync actions run here so they don't stall the event loop
+    shared by every other run.
+    """
+
+    _pool: ThreadPoolExecutor
+    _lock: threading.Lock
+    _queued: int
+    _running: int
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="action_engine"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+
+    @property
+    def max_workers(self) -> int:
+        return self._pool._max_workers
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of submitted calls that have not started yet."""
+        return self._queued
+
+    @property
+    def running(self) -> int:
+        """Number of calls currently executing on a worker."""
+        return self._running
+
+    def submit[T](self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> Future[T]:
+        with self._lock:
+            self._queued += 1
+        future = self._pool.submit(self._run, fn, *args, **kwargs)
+        future.add_done_callback(self._discard_cancelled)
+        return future
+
+    def _discard_cancelled(self, future: Future[Any]) -> None:
+        # A call cancelled before a worker picked it up never reaches _run
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def _run[T](self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+class ProcessPool(Executor):
+    """
+    A process pool for CPU-heavy actions. `initializer` runs once in every
+    worker (e.g. to load a model), and `warmup=True` starts all workers when
+    the pool is created instead of on the first calls.
+    """
+
+    _pool: ProcessPoolExecutor
+    _max_workers: int
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        initializer: Callable[..., Any] | None = None,
+        initargs: tuple[Any, ...] = (),
+        warmup: bool = False,
+        mp_context: BaseContext | None = None,
+    ) -> None:
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(
+            max_workers=self._max_workers,
+            mp_context=mp_context,
+            initializer=initializer,
+            initargs=initargs,
+        )
+        if warmup:
+            wait_all([self._pool.submit(_noop) for _ in range(self._max_workers)])
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def submit[T](self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> Future[T]:
+        return self._pool.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+def _noop() -> None:
+    pass
+
+
+def call_in_process(module: str, qualname: str, payload: bytes) -> bytes:
+    """
+    Worker-side entry point of a process action. The function is looked up by
+    name since `@engine.action` rebinds the module attribute to the Action, and
+    inputs and outputs travel as pickles so errors can name the culprit.
+    """
+    fn: Any = importlib.import_module(module)
+    for part in qualname.split("."):
+        fn = getattr(fn, part)
+    fn = getattr(fn, "_fn", fn)
+    result = fn(**pickle.loads(payload))
+    try:
+        return pickle.dumps(result)
+    except Exception as e:
+        raise TypeError(
+            f"Result of {qualname} of type {type(result).__name__} "
+            f"is not picklable: {e}"
+        ) from None
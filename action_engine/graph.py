@@ -3,38 +3,71 @@ from action_engine.types import Displayable
 
 class Graph[N: Displayable, E]:
     """
-    A directed graph with nodes of type N and edges of type E.
+    A directed graph with nodes of type N and edges of type E. Two nodes are
+    connected by at most one edge, which carries every label added for them.
+    Topological order and reachability are cached until the graph changes.
     """
 
     nodes: dict[N, list[N]]
-    edges: dict[tuple[N, N], E]
+    edges: dict[tuple[N, N], list[E]]
+    _predecessors: dict[N, list[N]]
+    _order: list[N] | None
+    _reachable: dict[N, frozenset[N]]
 
     def __init__(self) -> None:
         self.nodes = {}
         self.edges = {}
+        self._predecessors = {}
+        self._order = None
+        self._reachable = {}
+
+    def _invalidate(self) -> None:
+        self._order = None
+        self._reachable = {}
 
     def add_node(self, node: N) -> None:
         """
         Add a node to the graph.
         """
-        self.nodes[node] = []
+        if node not in self.nodes:
+            self.nodes[node] = []
+            self._predecessors[node] = []
+            self._invalidate()
+
+    def remove_node(self, node: N) -> None:
+        """
+        Remove a node and every edge from or to it.
+        """
+        for succ in self.nodes.pop(node):
+            del self.edges[(node, succ)]
+            if succ != node:
+                self._predecessors[succ].remove(node)
+        for pred in self._predecessors.pop(node):
+            if pred != node:
+                del self.edges[(pred, node)]
+                self.nodes[pred].remove(node)
+        self._invalidate()
 
     def add_edge(self, node1: N, node2: N, edge: E) -> None:
         """
-        Add an edge between two nodes.
+        Add an edge between two nodes, or a label to the existing edge.
         """
-        if node1 not in self.nodes:
+        labels = self.edges.get((node1, node2))
+        if labels is None:
             self.add_node(node1)
-        if node2 not in self.nodes:
             self.add_node(node2)
-        self.nodes[node1].append(node2)
-        self.edges[(node1, node2)] = edge
+            self.nodes[node1].append(node2)
+            self._predecessors[node2].append(node1)
+            self.edges[(node1, node2)] = [edge]
+            self._invalidate()
+        elif edge not in labels:
+            labels.append(edge)
 
     def get_edges(self, node: N) -> list[E]:
         """
-        Get all edges originating from a node.
+        Get the labels of all edges originating from a node.
         """
-        return [self.edges[(node, node2)] for node2 in self.nodes[node]]
+        return [e for node2 in self.nodes[node] for e in self.edges[(node, node2)]]
 
     def get_nodes(self) -> list[N]:
         """
@@ -48,6 +81,46 @@ class Graph[N: Displayable, E]:
         """
         return self.nodes[node]
 
+    def get_predecessors(self, node: N) -> list[N]:
+        """
+        Get all nodes with an edge to a given node.
+        """
+        return self._predecessors[node]
+
+    def topological_order(self) -> list[N]:
+        """
+        Get the nodes so that every edge points forward. Raises ValueError if
+        the graph has a cycle.
+        """
+        if self._order is None:
+            indegree = {n: len(preds) for n, preds in self._predecessors.items()}
+            order = [n for n, d in indegree.items() if d == 0]
+            for node in order:
+                for succ in self.nodes[node]:
+                    indegree[succ] -= 1
+                    if indegree[succ] == 0:
+                        order.append(succ)
+            if len(order) != len(self.nodes):
+                raise ValueError("Graph has a cycle")
+            self._order = order
+        return self._order
+
+    def reachable(self, node: N) -> frozenset[N]:
+        """
+        Get all nodes reachable from a given node through one or more edges.
+        """
+        reach = self._reachable.get(node)
+        if reach is None:
+            seen: set[N] = set()
+            stack = list(self.nodes[node])
+            while stack:
+                n = stack.pop()
+                if n not in seen:
+                    seen.add(n)
+                    stack.extend(self.nodes[n])
+            reach = self._reachable[node] = frozenset(seen)
+        return reach
+
     def display_mermaid(self) -> str:
         """
         Generates a Mermaid diagram string representing the graph.
@@ -74,9 +147,10 @@ class Graph[N: Displayable, E]:
                 f"{node.get_name()}({node.get_name()} \n +++++++++++++ \n {"+++++++++++++\n".join(node.get_info())})"
             )
 
-        for coordinate, e in self.edges.items():
+        for coordinate, labels in self.edges.items():
             mermaid.append(
-                f"{coordinate[0].get_name()} -- {e} --> {coordinate[1].get_name()}"
+                f"{coordinate[0].get_name()} -- {", ".join(map(str, labels))} --> "
+                f"{coordinate[1].get_name()}"
             )
 
         return "\n".join(mermaid)
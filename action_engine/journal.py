@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import pickle
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from action_engine.action import Action
+from action_engine.cache import fingerprint
+from action_engine.checkpoint import frame, read_frames
+from action_engine.param import OutputParam
+
+
+@dataclass
+class Invocation:
+    """
+    One action call: a fingerprint of its inputs (None if they could not be
+    hashed) and its outputs as (name, value) pairs (None if they could not be
+    pickled, in which case replay runs the action live).
+    """
+
+    action: str
+    inputs: str | None
+    outputs: list[tuple[str, Any]] | None
+
+
+@dataclass
+class JournalEntry:
+    """The selector decision of one step and the invocations it led to."""
+
+    step: int
+    selection: list[str]
+    invocations: list[Invocation] = field(default_factory=list)
+
+
+class JournalStore:
+    """
+    A directory of run journals, one append-only `<run_id>.journal` per run.
+    Each entry is prefixed with its length, so an entry cut off by a crash is
+    ignored and the run replays up to the previous one.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, run_id: str) -> Path:
+        return self.directory / f"{run_id}.journal"
+
+    def append(self, run_id: str, entry: JournalEntry) -> None:
+        data = pickle.dumps(entry)
+        with self._lock, open(self._path(run_id), "ab") as f:
+            f.write(frame(data))
+
+    def load(self, run_id: str) -> list[JournalEntry]:
+        path = self._path(run_id)
+        if not path.exists():
+            raise KeyError(f"No journal for run {run_id}")
+        with open(path, "rb") as f:
+            return [pickle.loads(data) for data in read_frames(f)]
+
+
+def input_fingerprint(action: Action, params: dict[str, Any]) -> str | None:
+    """Fingerprint the inputs of `action`, leaving out the base state."""
+    try:
+        return fingerprint(
+            action.name, {k: v for k, v in params.items() if k != "base"}
+        )
+    except TypeError:
+        return None
+
+
+class RunJournal:
+    """
+    The journal of one run. When recording, every step is appended to the
+    store. When replaying `entries`, selector decisions and action outputs
+    are taken from the journal until the run diverges from it (a selected
+    action is not ready or an action's inputs differ), after which the run
+    continues live.
+    """
+
+    run_id: str
+    store: JournalStore | None
+    entries: dict[int, JournalEntry] | None
+    diverged_at: int | None
+    _current: JournalEntry | None
+
+    def __init__(
+        self,
+        run_id: str,
+        store: JournalStore | None = None,
+        entries: list[JournalEntry] | None = None,
+    ) -> None:
+        self.run_id = run_id
+        self.store = store
+        self.entries = {e.step: e for e in entries} if entries is not None else None
+        self.diverged_at = None
+        self._current = None
+
+    @property
+    def replaying(self) -> bool:
+        return self.entries is not None and self.diverged_at is None
+
+    def _diverge(self, step: int) -> None:
+        if self.diverged_at is None:
+            self.diverged_at = step
+
+    def begin(self, step: int, selection: list[Action]) -> None:
+        """Start recording a step with the given selector decision."""
+        self._current = JournalEntry(step, [a.name for a in selection])
+
+    def record(
+        self,
+        action: Action,
+        inputs: str | None,
+        outputs: list[tuple[OutputParam, Any]],
+    ) -> None:
+        assert self._current is not None
+        pairs: list[tuple[str, Any]] | None = [(p.name, v) for p, v in outputs]
+        try:
+            pickle.dumps(pairs)
+        except Exception:
+            pairs = None
+        self._current.invocations.append(Invocation(action.name, inputs, pairs))
+
+    def end(self) -> None:
+        """Append the current step to the store."""
+        if self._current is not None and self.store is not None:
+            self.store.append(self.run_id, self._current)
+        self._current = None
+
+    def select(self, step: int, possible_actions: list[Action]) -> list[Action] | None:
+        """Return the recorded selection of `step`, or None once diverged."""
+        if not self.replaying:
+            return None
+        assert self.entries is not None
+        entry = self.entries.get(step)
+        ready = {a.name: a for a in possible_actions}
+        if entry is None or any(name not in ready for name in entry.selection):
+            self._diverge(step)
+            return None
+        return [ready[name] for name in entry.selection]
+
+    def outputs(
+        self, step: int, action: Action, inputs: str | None
+    ) -> list[tuple[OutputParam, Any]] | None:
+        """
+        Return the recorded outputs of `action` at `step` if its inputs match
+        the recording, or None if it has to run live. Inputs that cannot be
+        fingerprinted cannot be matched, so the action always runs live.
+        """
+        if not self.replaying:
+            return None
+        assert self.entries is not None
+        entry = self.entries.get(step)
+        recorded = None
+        if entry is not None:
+            recorded = next(
+                (i for i in entry.invocations if i.action == action.name), None
+            )
+        if recorded is None or recorded.inputs != inputs:
+            self._diverge(step)
+            return None
+        if recorded.outputs is None or inputs is None:
+            return None
+        params = action.output_params
+        return [(params.params[name], val) for name, val in recorded.outputs]
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import deque
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import IO
+
+
+class LogWriter:
+    """
+    Appends lines to a log file from a background thread, so that writing
+    never blocks a step. Lines are written in batches, once `batch_size` are
+    pending or every `flush_interval` seconds. When the file would exceed
+    `max_bytes`, it is rotated to `<path>.1` (and `<path>.1` to `<path>.2`, up
+    to `backups` files), like logging.handlers.RotatingFileHandler.
+
+    An error in the writer thread is raised by the next `flush` or `close`.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        batch_size: int = 64,
+        flush_interval: float = 1.0,
+        max_bytes: int = 1 << 20,
+        backups: int = 3,
+    ) -> None:
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._pending: list[str] = []
+        self._queued = 0
+        self._written = 0
+        self._flushing = False
+        self._closed = False
+        self._error: BaseException | None = None
+        self._file: IO[str] | None = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="LogWriter", daemon=True)
+        self._thread.start()
+
+    def write(self, line: str) -> None:
+        """Queue `line` (which should end with a newline) for writing."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"LogWriter for {self.path} is closed")
+            self._pending.append(line)
+            self._queued += 1
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+
+    def flush(self) -> None:
+        """Block until every line queued so far is written."""
+        with self._cond:
+            target = self._queued
+            self._flushing = True
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: self._written >= target or self._error is not None)
+            self._raise()
+
+    def close(self) -> None:
+        """Write the pending lines and stop the writer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._raise()
+
+    def _raise(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: len(self._pending) >= self.batch_size
+                    or self._flushing
+                    or self._closed,
+                    timeout=self.flush_interval,
+                )
+                batch, self._pending = self._pending, []
+                self._flushing = False
+                closed = self._closed
+            try:
+                if batch:
+                    self._write("".join(batch))
+            except Exception as e:
+                with self._cond:
+                    self._error = e
+            with self._cond:
+                self._written += len(batch)
+                self._cond.notify_all()
+            if closed:
+                if self._file is not None:
+                    self._file.close()
+                return
+
+    def _write(self, data: str) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        size = len(data.encode("utf-8"))
+        if self.max_bytes and self._file.tell() and self._file.tell() + size > self.max_bytes:
+            self._rotate()
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(data)
+        self._file.flush()
+
+    def _rotate(self) -> None:
+        assert self._file is not None
+        self._file.close()
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for i in range(self.backups - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                os.replace(src, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+
+
+class Memory:
+    """
+    An agent's `capacity` most recent entries, each stamped with the time it
+    was added. Adding is O(1) and also queues the entry on `log` if given.
+    `prompt` renders the entries newest first and is only rebuilt after an
+    entry was added.
+    """
+
+    def __init__(self, capacity: int = 100, log: LogWriter | None = None) -> None:
+        self.capacity = capacity
+        self.log = log
+        self._entries: deque[tuple[str, str]] = deque(maxlen=capacity)
+        self._lines: deque[str] = deque(maxlen=capacity)
+        self._rendered: str | None = ""
+
+    def add(self, item: str) -> None:
+        if not isinstance(item, str):
+            raise ValueError("Only strings can be added to the memory")
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        line = f"{timestamp} - {item}"
+        self._entries.append((item, timestamp))
+        self._lines.appendleft(line)
+        self._rendered = None
+        if self.log is not None:
+            self.log.write(line + "\n")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[tuple[str, str]]:
+        """Iterate over the (item, timestamp) entries, oldest first."""
+        return iter(self._entries)
+
+    def prompt(self) -> str:
+        """The entries as `<timestamp> - <item>` lines, most recent first."""
+        if self._rendered is None:
+            self._rendered = "\n".join(self._lines)
+        return self._rendered
+
+    def close(self) -> None:
+        """Flush and close the log, if any."""
+        if self.log is not None:
+            self.log.close()
@@ -1,17 +1,36 @@
 from __future__ import annotations
 
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 from types import UnionType
-from typing import Any, override, get_args
+from typing import Any, override, get_args, TYPE_CHECKING
 
-from pydantic import BaseModel, ConfigDict
+from action_engine.compat import Validation, compatible, validate
 
+if TYPE_CHECKING:
+    from action_engine.ready import ReadyIndex
+
+
+@dataclass(frozen=True, slots=True)
+class Param:
+    """
+    An immutable (name, type) descriptor. Params are created once at
+    registration and shared; use `Param.of` on hot paths to reuse an
+    interned instance instead of allocating a new one per value.
+    """
 
-class Param(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
     name: str
     type_: type | UnionType
 
+    @staticmethod
+    def of(name: str, type_: type | UnionType) -> Param:
+        """Return the interned Param for (name, type_)."""
+        key = (name, type_)
+        param = _interned.get(key)
+        if param is None:
+            param = _interned.setdefault(key, Param(name=name, type_=type_))
+        return param
+
     def __str__(self) -> str:
         if isinstance(self.type_, type):
             return f"{self.name}: {self.type_.__name__}"
@@ -21,13 +40,17 @@ class Param(BaseModel):
             )
 
 
+_interned: dict[tuple[str, type | UnionType], Param] = {}
+
+
+@dataclass(frozen=True, slots=True)
 class InputParam(Param):
-    deps: list[str]
-    ...
+    deps: list[str] = field(default_factory=list, hash=False)
 
 
+@dataclass(frozen=True, slots=True)
 class OutputParam(Param):
-    cascade: bool
+    cascade: bool = False
 
 
 class ParamSet[T: Param]:
@@ -51,13 +74,13 @@ class ParamSet[T: Param]:
         if not self._params.keys() <= other.params.keys():
             return False
         return all(
-            issubclass(other.params[name].type_, self.params[name].type_)
+            compatible(other.params[name].type_, self.params[name].type_)
             for name in self._params
         )
 
     def __iter__(self) -> Iterator[T]:
         """Iterate over the set elements."""
-        return iter([p for name, p in self._params.items()])
+        return iter(self._params.values())
 
     def __len__(self) -> int:
         """Return the size of the set."""
@@ -67,9 +90,7 @@ class ParamSet[T: Param]:
         """
         Retrieve the Param at the given index, using the insertion order.
         """
-        items = list(self._params.items())
-        name, p = items[index]
-        return p
+        return list(self._params.values())[index]
 
     def get(self, name: str) -> T | None:
         """Return the Param object with the given name."""
@@ -90,19 +111,53 @@ class ParamSet[T: Param]:
 
 
 class StatefulParamSet(ParamSet):
-    _state: dict[str, Any]
+    """
+    A ParamSet holding a value for every param. Each present param records the
+    runtime type of its value, which is what readiness checks compare against.
+    Values are validated against the declared type of the param they are set
+    through, with the given `validation` strictness. With `track_changes`,
+    the names written or removed since the last `take_changes` are recorded.
+    """
 
-    def __init__(self, params: list[Param]) -> None:
+    _state: dict[str, Any]
+    _index: ReadyIndex | None
+    _validation: Validation
+    _changes: dict[str, bool] | None
+
+    def __init__(
+        self,
+        params: list[Param],
+        index: ReadyIndex | None = None,
+        validation: Validation = "shallow",
+        track_changes: bool = False,
+    ) -> None:
         super().__init__(params)
         self._state = {}
+        self._index = index
+        self._validation = validation
+        self._changes = {} if track_changes else None
+        if index is not None:
+            for param in params:
+                index.set(param.name, param.type_)
+
+    @property
+    def index(self) -> ReadyIndex | None:
+        return self._index
 
     def set_state(self, param: Param, value: Any) -> None:
         if value is None:
             self.discard(param.name)
             return
-        assert isinstance(value, param.type_)
-        self.add(param)
+        assert validate(value, param.type_, self._validation), (
+            f"Value of type {type(value).__name__} is not valid for {param}"
+        )
+        present = Param.of(param.name, type(value))
+        self.add(present)
         self._state[param.name] = value
+        if self._index is not None:
+            self._index.set(param.name, present.type_)
+        if self._changes is not None:
+            self._changes[param.name] = True
 
     def get_state(self, param: str) -> Any:
         return self._state.get(param)
@@ -112,3 +167,23 @@ class StatefulParamSet(ParamSet):
         if name in self:
             super().discard(name)
             del self._state[name]
+            if self._index is not None:
+                self._index.discard(name)
+            if self._changes is not None:
+                self._changes[name] = False
+
+    def discard_all(self, names: Iterable[str]) -> None:
+        """Remove every param in `names` that is present."""
+        for name in names:
+            self.discard(name)
+
+    def take_changes(self) -> tuple[set[str], set[str]]:
+        """
+        Return the names set and the names removed since the previous call,
+        and start recording afresh. Requires `track_changes`.
+        """
+        if self._changes is None:
+            raise ValueError("StatefulParamSet was created without track_changes")
+        changes, self._changes = self._changes, {}
+        changed = {name for name, present in changes.items() if present}
+        return changed, set(changes) - changed
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Sequence
+from types import UnionType
+from typing import Any, override
+
+from action_engine.action import Action
+from action_engine.compat import Validation, compatible, validate
+from action_engine.param import Param, StatefulParamSet
+
+
+class Plan:
+    """
+    A frozen, integer-indexed form of an engine's registry, built by
+    `Engine.compile`.
+
+    Every param gets a slot id and every distinct (param, consumed type) pair
+    a bit. An action's required inputs are the mask of its pairs, and a run's
+    state is the mask of pairs satisfied by the runtime types of its values,
+    so an action is ready iff `required & ~state == 0`. Cascades are slot
+    masks. Ready sets are computed by or-ing, for each unsatisfied pair, the
+    mask of actions needing it, and memoized per state mask.
+    """
+
+    params: tuple[str, ...]
+    param_ids: dict[str, int]
+    actions: tuple[Action, ...]
+    action_ids: dict[str, int]
+    required: tuple[int, ...]
+    slot_bits: tuple[int, ...]
+    _needs: tuple[int, ...]
+    _all_pairs: int
+    _all_actions: int
+    _consumed: tuple[tuple[tuple[type | UnionType, int], ...], ...]
+    _bits: dict[tuple[int, type | UnionType], int]
+    _ready: dict[int, list[Action]]
+    _masks: dict[tuple[str, ...], int]
+
+    max_memo: int = 4096
+
+    def __init__(
+        self, actions: Sequence[Action], cascades: dict[str, tuple[str, ...]]
+    ) -> None:
+        names: dict[str, None] = {}
+        for action in actions:
+            names.update(dict.fromkeys(p.name for p in action.input_params))
+            names.update(dict.fromkeys(p.name for p in action.output_params))
+        for name, closure in cascades.items():
+            names.update(dict.fromkeys((name, *closure)))
+        self.params = tuple(names)
+        self.param_ids = {name: i for i, name in enumerate(self.params)}
+        self.actions = tuple(actions)
+        self.action_ids = {a.name: i for i, a in enumerate(self.actions)}
+
+        pairs: dict[tuple[int, type | UnionType], int] = {}
+        required = []
+        for action in self.actions:
+            mask = 0
+            for p in action.input_params:
+                key = (self.param_ids[p.name], p.type_)
+                bit = pairs.setdefault(key, 1 << len(pairs))
+                mask |= bit
+            required.append(mask)
+        self.required = tuple(required)
+        needs = [0] * len(pairs)
+        for i, mask in enumerate(required):
+            for j in range(mask.bit_length()):
+                if mask >> j & 1:
+                    needs[j] |= 1 << i
+        self._needs = tuple(needs)
+        self._all_pairs = (1 << len(pairs)) - 1
+        self._all_actions = (1 << len(self.actions)) - 1
+
+        consumed: list[list[tuple[type | UnionType, int]]] = [[] for _ in self.params]
+        for (slot, type_), bit in pairs.items():
+            consumed[slot].append((type_, bit))
+        self._consumed = tuple(tuple(c) for c in consumed)
+        self.slot_bits = tuple(sum(bit for _, bit in c) for c in consumed)
+
+        self._bits = {}
+        self._ready = {}
+        self._masks = {closure: self.slots(closure) for closure in cascades.values()}
+
+    def slot(self, name: str) -> int:
+        slot = self.param_ids.get(name)
+        if slot is None:
+            raise KeyError(f"Param {name!r} is not part of the compiled plan")
+        return slot
+
+    def slots(self, names: Iterable[str]) -> int:
+        """Return the slot mask of `names`, ignoring unknown names."""
+        mask = 0
+        for name in names:
+            slot = self.param_ids.get(name)
+            if slot is not None:
+                mask |= 1 << slot
+        return mask
+
+    def bits(self, slot: int, type_: type | UnionType) -> int:
+        """The (param, consumed type) bits satisfied by a value of `type_` in `slot`."""
+        key = (slot, type_)
+        bits = self._bits.get(key)
+        if bits is None:
+            bits = 0
+            for expected, bit in self._consumed[slot]:
+                if compatible(type_, expected):
+                    bits |= bit
+            self._bits[key] = bits
+        return bits
+
+    def mask_of(self, names: tuple[str, ...]) -> int:
+        """Memoized `slots`; the cascade closures of the engine are precomputed."""
+        mask = self._masks.get(names)
+        if mask is None:
+            mask = self._masks[names] = self.slots(names)
+        return mask
+
+    def ready(self, state: int) -> list[Action]:
+        """Return the actions ready in `state`, in registration order."""
+        actions = self._ready.get(state)
+        if actions is None:
+            if len(self._ready) >= self.max_memo:
+                self._ready.clear()
+            blocked = 0
+            missing = self._all_pairs & ~state
+            while missing:
+                low = missing & -missing
+                blocked |= self._needs[low.bit_length() - 1]
+                missing ^= low
+            ready = self._all_actions & ~blocked
+            actions = []
+            while ready:
+                low = ready & -ready
+                actions.append(self.actions[low.bit_length() - 1])
+                ready ^= low
+            self._ready[state] = actions
+        return list(actions)
+
+
+class SlotParamSet(StatefulParamSet):
+    """
+    The run state of a compiled engine: one list of values indexed by slot,
+    a mask of the present slots and a mask of the satisfied input bits. The
+    Param of a present value is always Param.of(name, type(value)), so types
+    are not stored. Params no action consumes or produces (e.g. `base` when
+    no action takes it) have no slot and are kept in a plain dict, so they
+    never affect readiness.
+    """
+
+    _plan: Plan
+    _values: list[Any]
+    _extra: dict[str, Any]
+    _present: int
+    _satisfied: int
+
+    def __init__(
+        self,
+        plan: Plan,
+        validation: Validation = "shallow",
+        track_changes: bool = False,
+    ) -> None:
+        self._plan = plan
+        self._values = [None] * len(plan.params)
+        self._extra = {}
+        self._present = 0
+        self._satisfied = 0
+        self._index = None
+        self._validation = validation
+        self._changes = {} if track_changes else None
+
+    @property
+    def params(self) -> dict[str, Param]:
+        return {p.name: p for p in self}
+
+    def __contains__(self, name: str) -> bool:
+        slot = self._plan.param_ids.get(name)
+        if slot is None:
+            return name in self._extra
+        return self._present >> slot & 1 == 1
+
+    def __iter__(self) -> Iterator[Param]:
+        names = self._plan.params
+        for slot, value in enumerate(self._values):
+            if value is not None:
+                yield Param.of(names[slot], type(value))
+        for name, value in self._extra.items():
+            yield Param.of(name, type(value))
+
+    def __len__(self) -> int:
+        return self._present.bit_count() + len(self._extra)
+
+    def __getitem__(self, index: int) -> Param:
+        return list(self)[index]
+
+    def __repr__(self) -> str:
+        return f"SlotParamSet({[p.name for p in self]})"
+
+    def get(self, name: str) -> Param | None:
+        value = self.get_state(name)
+        return None if value is None else Param.of(name, type(value))
+
+    def add(self, param: Param) -> None:
+        raise TypeError("SlotParamSet only holds params with a value, use set_state")
+
+    @override
+    def set_state(self, param: Param, value: Any) -> None:
+        if value is None:
+            self.discard(param.name)
+            return
+        assert validate(value, param.type_, self._validation), (
+            f"Value of type {type(value).__name__} is not valid for {param}"
+        )
+        plan = self._plan
+        slot = plan.param_ids.get(param.name)
+        if slot is None:
+            self._extra[param.name] = value
+        else:
+            self._values[slot] = value
+            self._present |= 1 << slot
+            self._satisfied = (self._satisfied & ~plan.slot_bits[slot]) | plan.bits(
+                slot, type(value)
+            )
+        if self._changes is not None:
+            self._changes[param.name] = True
+
+    @override
+    def get_state(self, param: str) -> Any:
+        slot = self._plan.param_ids.get(param)
+        return self._extra.get(param) if slot is None else self._values[slot]
+
+    def _clear(self, slot: int) -> None:
+        self._values[slot] = None
+        self._present &= ~(1 << slot)
+        self._satisfied &= ~self._plan.slot_bits[slot]
+        if self._changes is not None:
+            self._changes[self._plan.params[slot]] = False
+
+    @override
+    def discard(self, name: str) -> None:
+        slot = self._plan.param_ids.get(name)
+        if slot is None:
+            if self._extra.pop(name, None) is not None and self._changes is not None:
+                self._changes[name] = False
+        elif self._present >> slot & 1:
+            self._clear(slot)
+
+    @override
+    def discard_all(self, names: Iterable[str]) -> None:
+        plan = self._plan
+        if not isinstance(names, tuple):
+            names = tuple(names)
+        if self._extra:
+            for name in names:
+                if name not in plan.param_ids:
+                    self.discard(name)
+        mask = plan.mask_of(names)
+        hit = self._present & mask
+        while hit:
+            low = hit & -hit
+            self._clear(low.bit_length() - 1)
+            hit ^= low
+
+    def ready(self) -> list[Action]:
+        """Return the actions that can be invoked with this state, in registration order."""
+        return self._plan.ready(self._satisfied)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Literal
+
+from action_engine.action import Action
+from action_engine.ready import ActionIndex
+
+type Pruning = Literal["off", "filter", "rank"]
+
+
+class DeadEndPruner:
+    """
+    Finds the ready actions that can still lead to a terminal action.
+
+    From the names of the present params, a forward pass over the producer and
+    consumer indexes finds every action that could eventually run, and a
+    backward pass from the terminal ones among them keeps the actions whose
+    outputs feed a path to a terminal action. Param types and cascades are
+    not considered, so the result over-approximates what is reachable. Results
+    are memoized per set of present names, which runs revisit constantly.
+
+    With policy "filter" the other actions are dropped from the candidates
+    (unless none would be left), with "rank" they are moved to the end.
+    """
+
+    _index: ActionIndex
+    _memo: dict[frozenset[str], frozenset[str]]
+
+    max_memo: int = 1024
+
+    def __init__(self, index: ActionIndex, policy: Pruning = "off") -> None:
+        self._index = index
+        self.policy = policy
+        self._memo = {}
+
+    def clear(self) -> None:
+        """Forget memoized results, e.g. after registering an action."""
+        self._memo = {}
+
+    def progressing(self, present: frozenset[str]) -> frozenset[str]:
+        """Return the names of the actions that can lead to a terminal action."""
+        useful = self._memo.get(present)
+        if useful is None:
+            if len(self._memo) >= self.max_memo:
+                self._memo = {}
+            useful = self._memo[present] = self._compute(present)
+        return useful
+
+    def _compute(self, present: frozenset[str]) -> frozenset[str]:
+        index = self._index
+        available = set(present)
+        missing = {
+            name: sum(p.name not in available for p in a.input_params)
+            for name, a in index.actions.items()
+        }
+        queue = [index.actions[name] for name, n in missing.items() if n == 0]
+        feasible: set[str] = set()
+        for action in queue:
+            feasible.add(action.name)
+            for out in action.output_params:
+                if out.name in available:
+                    continue
+                available.add(out.name)
+                for consumer in index.consumers.get(out.name, ()):
+                    missing[consumer.name] -= 1
+                    if missing[consumer.name] == 0:
+                        queue.append(consumer)
+
+        useful: set[str] = set()
+        stack = [a for a in queue if a.final]
+        while stack:
+            action = stack.pop()
+            if action.name in useful:
+                continue
+            useful.add(action.name)
+            for p in action.input_params:
+                for producer in index.producers.get(p.name, ()):
+                    if producer.name in feasible and producer.name not in useful:
+                        stack.append(producer)
+        return frozenset(useful)
+
+    def apply(self, ready: list[Action], present: Iterable[str]) -> list[Action]:
+        """Filter or rank `ready` according to the policy."""
+        if self.policy == "off":
+            return ready
+        useful = self.progressing(frozenset(present))
+        if self.policy == "filter":
+            return [a for a in ready if a.name in useful] or ready
+        return sorted(ready, key=lambda a: a.name not in useful)
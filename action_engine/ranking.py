@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, TYPE_CHECKING
+
+from action_engine.action import Action
+
+if TYPE_CHECKING:
+    from action_engine.context import RunContext
+
+
+@dataclass
+class ActionStats:
+    """Invocation history of one action, across every run of an engine."""
+
+    calls: int = 0
+    failures: int = 0
+    total_ns: int = 0
+
+    @property
+    def success_rate(self) -> float:
+        """Laplace-smoothed, so unseen actions start at 0.5."""
+        return (self.calls - self.failures + 1) / (self.calls + 2)
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.calls if self.calls else 0.0
+
+
+type Scorer = Callable[[RunContext[Any], Action, ActionStats], float]
+
+
+def success(ctx: RunContext[Any], action: Action, stats: ActionStats) -> float:
+    """Favor actions that rarely fail."""
+    return stats.success_rate
+
+
+def speed(ctx: RunContext[Any], action: Action, stats: ActionStats) -> float:
+    """Favor fast actions: 1 for instant ones, 0.5 for ones taking a second."""
+    return 1 / (1 + stats.mean_ns / 1e9)
+
+
+def novelty(ctx: RunContext[Any], action: Action, stats: ActionStats) -> float:
+    """Penalize actions invoked in the last few steps of the same run."""
+    last = ctx.last_invoked.get(action.name)
+    if last is None:
+        return 0.0
+    return -1 / (1 + ctx.step - last)
+
+
+@dataclass
+class RankingMetrics:
+    """Timing and truncation counters of the ranking stage."""
+
+    calls: int = 0
+    total_ns: int = 0
+    candidates_in: int = 0
+    candidates_out: int = 0
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.calls if self.calls else 0.0
+
+
+class Ranker:
+    """
+    A stage between filtering and selection: scores the candidates with a
+    weighted sum of `scorers`, orders them by decreasing score (ties keep
+    registration order) and passes the first `top_k` to the selector, so the
+    selector's prompt stays bounded however many actions are ready.
+
+    The engine reports every invocation to `observe`, which keeps the
+    per-action stats the built-in scorers use.
+    """
+
+    top_k: int | None
+    scorers: list[tuple[Scorer, float]]
+    stats: dict[str, ActionStats]
+    metrics: RankingMetrics
+
+    def __init__(
+        self,
+        top_k: int | None = None,
+        scorers: list[tuple[Scorer, float]] | None = None,
+    ) -> None:
+        self.top_k = top_k
+        self.scorers = (
+            scorers if scorers is not None else [(success, 1.0), (speed, 0.5), (novelty, 1.0)]
+        )
+        self.stats = {}
+        self.metrics = RankingMetrics()
+
+    def _stats(self, action: Action) -> ActionStats:
+        stats = self.stats.get(action.name)
+        if stats is None:
+            stats = self.stats[action.name] = ActionStats()
+        return stats
+
+    def rank(self, ctx: RunContext[Any], candidates: list[Action]) -> list[Action]:
+        """Return the top `top_k` candidates, best first."""
+        start = time.monotonic_ns()
+        scored = []
+        for action in candidates:
+            stats = self._stats(action)
+            score = sum(w * scorer(ctx, action, stats) for scorer, w in self.scorers)
+            scored.append((-score, action))
+        # Python's sort is stable, so equal scores keep registration order.
+        scored.sort(key=lambda pair: pair[0])
+        ranked = [action for _, action in scored[: self.top_k]]
+
+        metrics = self.metrics
+        metrics.calls += 1
+        metrics.total_ns += time.monotonic_ns() - start
+        metrics.candidates_in += len(candidates)
+        metrics.candidates_out += len(ranked)
+        return ranked
+
+    async def observe[T](
+        self, ctx: RunContext[Any], action: Action, invocation: Awaitable[T]
+    ) -> T:
+        """Await `invocation`, recording its latency and outcome for `action`."""
+        stats = self._stats(action)
+        start = time.monotonic_ns()
+        try:
+            result = await invocation
+        except Exception:
+            stats.failures += 1
+            raise
+        finally:
+            stats.calls += 1
+            stats.total_ns += time.monotonic_ns() - start
+        return result
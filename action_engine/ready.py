@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from types import UnionType
+
+from action_engine.action import Action
+from action_engine.compat import compatible
+
+
+class ActionIndex:
+    """
+    Registration-time lookup tables shared by every run of an engine: the
+    registration order, maps from param name to the actions that consume and
+    produce it, and the number of inputs each action requires.
+    """
+
+    order: dict[str, int]
+    actions: dict[str, Action]
+    consumers: dict[str, list[Action]]
+    producers: dict[str, list[Action]]
+    required: dict[str, int]
+
+    def __init__(self) -> None:
+        self.order = {}
+        self.actions = {}
+        self.consumers = {}
+        self.producers = {}
+        self.required = {}
+
+    def register(self, action: Action) -> None:
+        """Add an action to the index, replacing any action with the same name."""
+        if action.name in self.actions:
+            self.unregister(action.name)
+        self.order.setdefault(action.name, len(self.order))
+        self.actions[action.name] = action
+        for p in action.input_params:
+            self.consumers.setdefault(p.name, []).append(action)
+        for out in action.output_params:
+            self.producers.setdefault(out.name, []).append(action)
+        self.required[action.name] = len(action.input_params)
+
+    def unregister(self, name: str) -> None:
+        """Remove an action from the index."""
+        action = self.actions.pop(name)
+        for p in action.input_params:
+            self.consumers[p.name].remove(action)
+        for out in action.output_params:
+            self.producers[out.name].remove(action)
+        del self.required[name]
+
+
+class ReadyIndex:
+    """
+    Incrementally tracks which actions can be invoked with the state of one run.
+
+    Every action keeps a counter of inputs that are still missing (absent or of
+    an incompatible type). Setting or discarding a param only touches the
+    actions that consume it, so reading the ready set costs O(changed) instead
+    of a rescan of every registered action.
+    """
+
+    _actions: ActionIndex
+    _types: dict[str, type | UnionType]
+    _missing: dict[str, int]
+    _ready: set[str]
+
+    def __init__(self, actions: ActionIndex) -> None:
+        self._actions = actions
+        self._types = {}
+        self._missing = {}
+        self._ready = {name for name, n in actions.required.items() if n == 0}
+
+    def set(self, name: str, type_: type | UnionType) -> None:
+        """Record that param `name` now holds a value of type `type_`."""
+        old = self._types.get(name)
+        self._types[name] = type_
+        for action in self._actions.consumers.get(name, ()):
+            expected = action.input_params.params[name].type_
+            was_ok = old is not None and compatible(old, expected)
+            is_ok = compatible(type_, expected)
+            if was_ok != is_ok:
+                self._adjust(action.name, -1 if is_ok else 1)
+
+    def discard(self, name: str) -> None:
+        """Record that param `name` has been removed from the state."""
+        old = self._types.pop(name, None)
+        if old is None:
+            return
+        for action in self._actions.consumers.get(name, ()):
+            if compatible(old, action.input_params.params[name].type_):
+                self._adjust(action.name, 1)
+
+    def _adjust(self, name: str, delta: int) -> None:
+        missing = self._missing.get(name, self._actions.required[name]) + delta
+        self._missing[name] = missing
+        if missing == 0:
+            self._ready.add(name)
+        else:
+            self._ready.discard(name)
+
+    def ready(self) -> list[Action]:
+        """Return the invokable actions in registration order."""
+        actions = self._actions
+        return [
+            actions.actions[name] for name in sorted(self._ready, key=actions.order.__getitem__)
+        ]
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import asyncio
+import collections.abc
+import threading
+from inspect import isasyncgenfunction, isawaitable, iscoroutinefunction, isgeneratorfunction
+from typing import Any, Callable, get_args, get_origin, get_type_hints
+
+# (value, generator to resume for teardown, loop owning an async instance)
+type _Instance = tuple[Any, Any, asyncio.AbstractEventLoop | None]
+
+
+class Resource[T]:
+    """
+    A resource shared by every run of an engine, e.g. an API client or a
+    connection, declared with `Engine.resource`. `fn` creates one instance.
+    If it is an (async) generator, it yields the instance once and the code
+    after the yield tears it down, like a FastAPI dependency.
+
+    At most `max_size` instances exist at a time. An action injected with the
+    resource leases one instance for the duration of its call; when all are
+    leased, callers wait for one to be released. The pool is safe to share
+    between runs on different threads and event loops.
+
+    Instances created by an async `fn` (aiohttp or httpx sessions) are bound
+    to the event loop that created them and only leased to callers on that
+    loop. When the pool is full of idle instances of other loops, one of them
+    is torn down on its loop to make room. `Engine.run` tears down the
+    instances of its loop before the loop closes; instances of loops closed
+    otherwise are dropped without teardown.
+    """
+
+    name: str
+    type_: type | None
+    max_size: int
+    _idle: list[_Instance]
+    _waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future[_Instance | None]]]
+
+    def __init__(
+        self,
+        fn: Callable[[], Any],
+        name: str | None = None,
+        max_size: int = 1,
+    ) -> None:
+        self.fn = fn
+        self.name = name or fn.__name__
+        self.max_size = max_size
+        self.type_ = self._extract_type(fn)
+        self._async = iscoroutinefunction(fn) or isasyncgenfunction(fn)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._waiters = []
+        self._teardowns: set[asyncio.Task[None]] = set()
+        self._size = 0
+        self._closed = False
+
+    @staticmethod
+    def _extract_type(fn: Callable[[], Any]) -> type | None:
+        """The class of the instances, from the return (or yield) annotation."""
+        if isinstance(fn, type):
+            return fn
+        type_ = get_type_hints(fn).get("return")
+        if isgeneratorfunction(fn) or isasyncgenfunction(fn):
+            if get_origin(type_) in (
+                collections.abc.Iterator,
+                collections.abc.Generator,
+                collections.abc.AsyncIterator,
+                collections.abc.AsyncGenerator,
+            ):
+                type_ = get_args(type_)[0]
+        return type_ if isinstance(type_, type) else None
+
+    @property
+    def size(self) -> int:
+        """The number of instances currently created."""
+        return self._size
+
+    @property
+    def idle(self) -> int:
+        """The number of created instances not leased to an action."""
+        return len(self._idle)
+
+    async def _create(self, owner: asyncio.AbstractEventLoop | None) -> _Instance:
+        if isasyncgenfunction(self.fn):
+            gen = self.fn()
+            return await anext(gen), gen, owner
+        if isgeneratorfunction(self.fn):
+            gen = self.fn()
+            return next(gen), gen, owner
+        value = self.fn()
+        if isawaitable(value):
+            value = await value
+        return value, None, owner
+
+    @staticmethod
+    async def _destroy(instance: _Instance) -> None:
+        gen = instance[1]
+        if isinstance(gen, collections.abc.AsyncGenerator):
+            await anext(gen, None)
+        elif gen is not None:
+            next(gen, None)
+
+    async def _destroy_anywhere(self, instance: _Instance) -> None:
+        """Tear down `instance` on the loop owning it, if that loop still runs."""
+        owner = instance[2]
+        if owner is None or owner is asyncio.get_running_loop():
+            await self._destroy(instance)
+        elif not owner.is_closed():
+            future = asyncio.run_coroutine_threadsafe(self._destroy(instance), owner)
+            await asyncio.wrap_future(future)
+
+    def _drop_dead(self) -> None:
+        """Forget idle instances whose loop is closed; they cannot be torn down."""
+        alive = [i for i in self._idle if i[2] is None or not i[2].is_closed()]
+        self._size -= len(self._idle) - len(alive)
+        self._idle = alive
+
+    async def acquire(self) -> _Instance:
+        """Lease an instance, creating one if the pool is not full."""
+        loop = asyncio.get_running_loop()
+        owner = loop if self._async else None
+        while True:
+            evicted = None
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError(f"Resource {self.name} is closed")
+                self._drop_dead()
+                for i in range(len(self._idle) - 1, -1, -1):
+                    if self._idle[i][2] is owner:
+                        return self._idle.pop(i)
+                create = True
+                if self._size < self.max_size:
+                    self._size += 1
+                elif self._idle:
+                    # Only instances of other loops are idle: replace one
+                    evicted = self._idle.pop(0)
+                else:
+                    create = False
+                    future: asyncio.Future[_Instance | None] = loop.create_future()
+                    self._waiters.append((loop, future))
+            if evicted is not None:
+                await self._destroy_anywhere(evicted)
+            if create:
+                try:
+                    return await self._create(owner)
+                except BaseException:
+                    with self._lock:
+                        self._size -= 1
+                        self._wake()
+                    raise
+            instance = await future
+            if instance is not None:
+                return instance
+
+    def _schedule(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        future: asyncio.Future[_Instance | None],
+        instance: _Instance | None,
+    ) -> bool:
+        if future.done():
+            return False
+        try:
+            loop.call_soon_threadsafe(self._resolve, future, instance)
+        except RuntimeError:  # the waiter's loop is closed
+            return False
+        return True
+
+    def _wake(self) -> None:
+        """Make the oldest waiter retry, e.g. after a slot was freed. Needs the lock."""
+        while self._waiters:
+            loop, future = self._waiters.pop(0)
+            if self._schedule(loop, future, None):
+                return
+
+    def _handoff(self, instance: _Instance) -> None:
+        """Pass `instance` to a waiter on its loop, or make it idle. Needs the lock."""
+        owner = instance[2]
+        i = 0
+        while i < len(self._waiters):
+            loop, future = self._waiters[i]
+            if owner is None or loop is owner:
+                del self._waiters[i]
+                if self._schedule(loop, future, instance):
+                    return
+            else:
+                i += 1
+        self._idle.append(instance)
+        # Waiters of other loops can now replace the idle instance
+        self._wake()
+
+    def _resolve(
+        self, future: asyncio.Future[_Instance | None], instance: _Instance | None
+    ) -> None:
+        if not future.done():
+            future.set_result(instance)
+            return
+        # The waiter was cancelled in the meantime.
+        with self._lock:
+            if instance is None:
+                self._wake()
+            elif self._closed:
+                self._size -= 1
+                task = asyncio.get_running_loop().create_task(self._destroy(instance))
+                self._teardowns.add(task)
+                task.add_done_callback(self._teardowns.discard)
+            else:
+                self._handoff(instance)
+
+    async def release(self, instance: _Instance) -> None:
+        """Return a leased instance to the pool."""
+        with self._lock:
+            closed = self._closed
+            if closed:
+                self._size -= 1
+            else:
+                self._handoff(instance)
+        if closed:
+            await self._destroy(instance)
+
+    async def release_loop(self) -> None:
+        """Tear down the idle instances owned by the running loop, before it closes."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            owned = [i for i in self._idle if i[2] is loop]
+            self._idle = [i for i in self._idle if i[2] is not loop]
+            self._size -= len(owned)
+            if owned:
+                self._wake()
+        for instance in owned:
+            await self._destroy(instance)
+
+    async def aclose(self) -> None:
+        """
+        Tear down the idle instances. Leased ones are torn down when released,
+        and acquiring afterwards raises RuntimeError.
+        """
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for instance in idle:
+            await self._destroy_anywhere(instance)
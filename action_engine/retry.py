@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+
+from pydantic import BaseModel, ConfigDict
+
+
+class RetryPolicy(BaseModel):
+    """
+    Bounds and retries an action's calls. Each attempt may take at most
+    `timeout` seconds. A blocking call cannot be interrupted, so a plain
+    function with a timeout runs on the engine's thread pool; an attempt
+    that times out is abandoned and its thread finishes in the background.
+    An exception matching `retry_on` (a timeout is a TimeoutError) is
+    retried up to `retries` times, sleeping `backoff * multiplier ** attempt`
+    seconds, capped at `max_backoff` and shortened by up to a `jitter`
+    fraction so that concurrent runs spread out.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    timeout: float | None = None
+    retries: int = 0
+    backoff: float = 0.5
+    multiplier: float = 2.0
+    max_backoff: float = 30.0
+    jitter: float = 0.5
+    retry_on: tuple[type[BaseException], ...] = (Exception,)
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to sleep after failed attempt number `attempt` (from 0)."""
+        delay = min(self.max_backoff, self.backoff * self.multiplier**attempt)
+        return delay * (1 - self.jitter * random.random())
+
+
+class RateLimiter:
+    """
+    A token bucket refilled at `rate` tokens per second and holding up to
+    `burst`. Callers reserve a token and sleep until it is due, so concurrent
+    runs sharing a limiter (from any thread or event loop) get a steady
+    throughput in arrival order instead of bursts of rate-limit errors.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token and return how long to wait before it is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self) -> None:
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self) -> None:
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Callable, Literal, TextIO
+
+type Phase = Literal[
+    "step", "filter", "rank", "select", "invoke", "update", "cascade", "run"
+]
+
+
+@dataclass(frozen=True, slots=True)
+class TraceEvent:
+    """
+    One timed phase of a run. Timestamps come from time.monotonic_ns, so
+    durations are exact but the values are only comparable within a process.
+    `parent_id` is the `span_id` of the enclosing phase of the same run (the
+    step of an invoke, the run of a step), None for the run itself.
+    """
+
+    phase: Phase
+    run_id: str
+    step: int
+    start_ns: int
+    end_ns: int
+    action: str | None = None
+    error: str | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    span_id: str = ""
+    parent_id: str | None = None
+
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+
+type Listener = Callable[[TraceEvent], None]
+
+
+class JsonlExporter:
+    """A listener appending every event as one JSON line to `path`."""
+
+    _file: TextIO
+
+    def __init__(self, path: str | Path) -> None:
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def __call__(self, event: TraceEvent) -> None:
+        line = json.dumps(asdict(event), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class OtelSpanAdapter:
+    """
+    A listener converting events into spans shaped like the OpenTelemetry
+    (OTLP JSON) span model, without depending on the OpenTelemetry SDK. Each
+    run is one trace; spans are kept in `spans` and passed to `sink` if given,
+    e.g. to forward them to a real exporter.
+    """
+
+    spans: list[dict[str, Any]]
+
+    def __init__(
+        self,
+        service_name: str = "action_engine",
+        sink: Callable[[dict[str, Any]], None] | None = None,
+    ) -> None:
+        self.service_name = service_name
+        self.sink = sink
+        self.spans = []
+        # Offset turning monotonic timestamps into unix epoch nanoseconds.
+        self._epoch_offset = time.time_ns() - time.monotonic_ns()
+
+    def __call__(self, event: TraceEvent) -> None:
+        attributes = {
+            "service.name": self.service_name,
+            "action_engine.run_id": event.run_id,
+            "action_engine.step": event.step,
+            **{f"action_engine.{k}": v for k, v in event.attributes.items()},
+        }
+        if event.action is not None:
+            attributes["action_engine.action"] = event.action
+        span = {
+            "trace_id": event.run_id.ljust(32, "0")[:32],
+            "span_id": event.span_id,
+            "parent_span_id": event.parent_id or "",
+            "name": f"action_engine.{event.phase}",
+            "kind": "SPAN_KIND_INTERNAL",
+            "start_time_unix_nano": event.start_ns + self._epoch_offset,
+            "end_time_unix_nano": event.end_ns + self._epoch_offset,
+            "attributes": attributes,
+            "status": (
+                {"code": "STATUS_CODE_ERROR", "message": event.error}
+                if event.error
+                else {"code": "STATUS_CODE_OK"}
+            ),
+        }
+        self.spans.append(span)
+        if self.sink is not None:
+            self.sink(span)
+
+
+# The innermost open span of the running task. Tasks copy it when created,
+# so concurrent invocations of a step all get the step as their parent.
+_current: ContextVar[Span | None] = ContextVar("action_engine_span", default=None)
+
+
+class Span:
+    """
+    Times a `with` block and emits it as a TraceEvent to `listeners`. The
+    span open around it in the same task becomes its parent if it belongs to
+    the same run.
+    """
+
+    __slots__ = (
+        "phase",
+        "run_id",
+        "step",
+        "action",
+        "attributes",
+        "listeners",
+        "start_ns",
+        "span_id",
+        "parent_id",
+        "_outer",
+    )
+
+    def __init__(
+        self,
+        listeners: list[Listener],
+        phase: Phase,
+        run_id: str,
+        step: int,
+        action: str | None = None,
+    ) -> None:
+        self.listeners = listeners
+        self.phase = phase
+        self.run_id = run_id
+        self.step = step
+        self.action = action
+        self.attributes: dict[str, Any] = {}
+        self.start_ns = 0
+        self.span_id = os.urandom(8).hex()
+        self.parent_id: str | None = None
+        self._outer: Span | None = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> Span:
+        outer = self._outer = _current.get()
+        if outer is not None and outer.run_id == self.run_id:
+            self.parent_id = outer.span_id
+        _current.set(self)
+        self.start_ns = time.monotonic_ns()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> None:
+        _current.set(self._outer)
+        event = TraceEvent(
+            phase=self.phase,
+            run_id=self.run_id,
+            step=self.step,
+            start_ns=self.start_ns,
+            end_ns=time.monotonic_ns(),
+            action=self.action,
+            error=repr(exc) if exc is not None else None,
+            attributes=self.attributes,
+            span_id=self.span_id,
+            parent_id=self.parent_id,
+        )
+        for listener in self.listeners:
+            listener(event)
+
+
+class NullSpan(Span):
+    """The span used when nothing is listening: every operation is a no-op."""
+
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        pass
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> Span:
+        return self
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> None:
+        pass
+
+
+NULL_SPAN = NullSpan()
@@ -1,4 +1,7 @@
 from abc import ABC
+from typing import Literal
+
+type ExecutorKind = Literal["inline", "thread", "process"]
 
 
 class Displayable(ABC):
@@ -1,5 +1,105 @@
-from typing import Any
+from collections.abc import Hashable, Sequence
+from functools import lru_cache
+from typing import Any, Callable
 
 
 def indexed_str(name: str, items: list[Any]) -> str:
-    return f"{name}: \n" + "\n".join([f"{i}: {str(action)}" for i, action in enumerate(items)]) + "\n"
\ No newline at end of file
+    return f"{name}: \n" + "\n".join([f"{i}: {str(action)}" for i, action in enumerate(items)]) + "\n"
+
+
+@lru_cache(maxsize=256)
+def _indexed_tuple(name: str, items: tuple[Hashable, ...]) -> str:
+    return indexed_str(name, list(items))
+
+
+def indexed_candidates(name: str, items: Sequence[Hashable]) -> str:
+    """
+    `indexed_str` for candidate lists, e.g. the actions passed to a selector.
+    Each distinct list is rendered once, so the items' `str` must not change.
+    """
+    return _indexed_tuple(name, tuple(items))
+
+
+class HistoryRenderer:
+    """
+    Renders a growing list like `indexed_str`, for prompts rebuilt every step.
+    Entries are rendered once, when they first appear, so the list must only
+    be appended to (rendering a different or shorter list starts over).
+
+    With a `budget` (in characters, or in whatever unit `measure` counts, e.g.
+    tokens), the entries that do not fit are left out: the first `head` ones
+    are kept, then as many of the most recent ones as fit. The left out
+    entries are replaced by a summary if `summarize` is given, else by a line
+    counting them; that line comes on top of the budget. Entries are left out
+    in order and never come back, so the summary is built incrementally:
+    `summarize(summary, dropped)` extends the previous summary (None at first)
+    with the entries dropped since, e.g. with one short LLM call.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        budget: int | None = None,
+        head: int = 0,
+        summarize: Callable[[str | None, Sequence[Any]], str] | None = None,
+        measure: Callable[[str], int] = len,
+    ) -> None:
+        self.name = name
+        self.budget = budget
+        self.head = head
+        self.summarize = summarize
+        self.measure = measure
+        self._header = f"{name}: \n"
+        self._reset(None)
+
+    def _reset(self, source: Sequence[Any] | None) -> None:
+        self._source = source
+        self._lines: list[str] = []
+        self._sizes: list[int] = []
+        self._total = self.measure(self._header)
+        self._full = self._header
+        self._text = indexed_str(self.name, [])
+        self._summary: str | None = None
+        self._dropped = 0
+
+    def render(self, items: Sequence[Any]) -> str:
+        if items is not self._source or len(items) < len(self._lines):
+            self._reset(items)
+        start = len(self._lines)
+        if len(items) == start:
+            return self._text
+        new = [f"{i}: {items[i]}\n" for i in range(start, len(items))]
+        sizes = [self.measure(line) for line in new]
+        self._lines += new
+        self._sizes += sizes
+        self._total += sum(sizes)
+        if self.budget is None or self._total <= self.budget:
+            self._full += "".join(new)
+            self._text = self._full
+        else:
+            self._text = self._truncate(items)
+        return self._text
+
+    def _truncate(self, items: Sequence[Any]) -> str:
+        assert self.budget is not None
+        lines, sizes = self._lines, self._sizes
+        head = min(self.head, len(lines))
+        used = self.measure(self._header) + sum(sizes[:head])
+        # Entries already dropped stay dropped, so the summary stays valid
+        first = max(head, self._dropped)
+        start = len(lines)
+        while start > first and used + sizes[start - 1] <= self.budget:
+            start -= 1
+            used += sizes[start]
+        if start == head:
+            return self._header + "".join(lines)
+        if self.summarize is not None:
+            if start > self._dropped:
+                dropped = items[max(head, self._dropped) : start]
+                self._summary = self.summarize(self._summary, dropped)
+                self._dropped = start
+            assert self._summary is not None
+            omitted = self._summary.rstrip("\n") + "\n"
+        else:
+            omitted = f"... {start - head} entries omitted ...\n"
+        return self._header + "".join(lines[:head]) + omitted + "".join(lines[start:])
@@ -0,0 +1,58 @@
+"""
+Per-step overhead of invoking an async action.
+
+"before" drives each step through `Action.invoke`, which creates and closes a
+new event loop per call (the behaviour `Engine.run` used to have).
+"after" awaits `Action.ainvoke` on one persistent loop, as `Engine.arun` does.
+
+Run with `python -m benchmarks.step_overhead`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Annotated
+
+from action_engine.action import Action
+from action_engine.param import Param, StatefulParamSet
+from action_engine.param_functions import Tag
+
+STEPS = 5_000
+
+
+async def step(base: int) -> Annotated[int, Tag("out")]:
+    return base + 1
+
+
+def bench_before(action: Action, state: StatefulParamSet, steps: int) -> float:
+    start = time.perf_counter()
+    for _ in range(steps):
+        action.invoke(state)
+    return (time.perf_counter() - start) / steps
+
+
+def bench_after(action: Action, state: StatefulParamSet, steps: int) -> float:
+    async def main() -> float:
+        start = time.perf_counter()
+        for _ in range(steps):
+            await action.ainvoke(state)
+        return (time.perf_counter() - start) / steps
+
+    return asyncio.run(main())
+
+
+def main() -> None:
+    action: Action = Action(step, final=False, description="")
+    state = StatefulParamSet([])
+    state.set_state(Param(name="base", type_=int), 0)
+
+    before = bench_before(action, state, STEPS)
+    after = bench_after(action, state, STEPS)
+    print(f"asyncio.run per step: {before * 1e6:8.1f} us/step")
+    print(f"persistent loop:      {after * 1e6:8.1f} us/step")
+    print(f"speedup:              {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
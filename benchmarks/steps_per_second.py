@@ -0,0 +1,58 @@
+"""
+Steps per second of the engine's run loop with trivial sync actions, so the
+number reflects orchestration overhead only: filtering, selecting, resolving
+inputs, collecting outputs and writing them back to the state.
+
+Run with `python -m benchmarks.steps_per_second`.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Annotated
+
+from pydantic import BaseModel
+
+from action_engine import Action, Engine, Tag
+
+STEPS = 20_000
+
+
+class Base(BaseModel):
+    steps: int = 0
+
+
+def build_engine(steps: int) -> Engine[Base]:
+    def selector(base: Base, actions: list[Action]) -> Action:
+        base.steps += 1
+        return actions[-1] if base.steps >= steps else actions[0]
+
+    engine = Engine(Base, selector)
+
+    @engine.action()
+    def produce(base: Base) -> Annotated[int, Tag("x")]:
+        return base.steps
+
+    @engine.action()
+    def transform(base: Base, x: int) -> tuple[
+        Annotated[int, Tag("y")], Annotated[str, Tag("z", cascade=True)]
+    ]:
+        return x + 1, "z"
+
+    @engine.action(terminal=True)
+    def finish(base: Base, y: int, z: str) -> None:
+        pass
+
+    return engine
+
+
+def main() -> None:
+    engine = build_engine(STEPS)
+    start = time.perf_counter()
+    engine.run(Base())
+    elapsed = time.perf_counter() - start
+    print(f"{STEPS / elapsed:10.0f} steps/s  ({elapsed / STEPS * 1e6:.1f} us/step)")
+
+
+if __name__ == "__main__":
+    main()
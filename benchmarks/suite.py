@@ -0,0 +1,147 @@
+"""
+Offline benchmark suite for the engine's orchestration overhead.
+
+Times action registration, ready-action filtering, cascades, Action.invoke and
+full run steps per second on a synthetic engine (filtering and cascades also on
+the compiled engine), writes the results as JSON,
+and fails when a result crosses a threshold:
+
+    python -m benchmarks.suite --out bench.json --thresholds benchmarks/thresholds.json
+
+A thresholds file maps a metric to {"max": ...} for timings or {"min": ...}
+for throughputs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable
+
+from action_engine import Action, RunContext
+from action_engine.param import Param
+
+from benchmarks.synthetic import Base, SyntheticConfig, build_engine, build_functions
+
+
+def _best(fn: Callable[[], Any], number: int, repeat: int = 5) -> float:
+    """Best mean time per call in seconds over `repeat` rounds of `number` calls."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return min(times)
+
+
+def _state_timings(ctx: RunContext[Base], config: SyntheticConfig) -> tuple[int, float, float]:
+    """Ready actions, filter time and cascade time (in us) on a half-filled state."""
+    ctx.params.set_state(Param.of("base", Base), Base())
+    for i in range(0, config.params, 2):
+        ctx.params.set_state(Param.of(f"p{i}", int), i)
+    ready = len(ctx.filter_actions())
+    filter_us = _best(ctx.filter_actions, 1_000) * 1e6
+
+    full = [Param.of(f"p{i}", int) for i in range(config.params)]
+    rounds = []
+    for _ in range(200):
+        for i, p in enumerate(full):
+            ctx.params.set_state(p, i)
+        start = time.perf_counter()
+        ctx.cascade("p0")
+        rounds.append(time.perf_counter() - start)
+    return ready, filter_us, min(rounds) * 1e6
+
+
+def run_suite(config: SyntheticConfig) -> dict[str, float]:
+    fns = build_functions(config)
+    results: dict[str, float] = {}
+
+    results["register_ms"] = _best(lambda: build_engine(config, fns), 1, 3) * 1e3
+
+    engine = build_engine(config, fns)
+    ctx = engine.create_context()
+    results["ready_actions"], results["filter_us"], results["cascade_us"] = (
+        _state_timings(ctx, config)
+    )
+    results["cascade_size"] = len(engine.cascades.get("p0", ()))
+
+    compiled = build_engine(config, fns)
+    compiled.compile()
+    _, results["compiled_filter_us"], results["compiled_cascade_us"] = _state_timings(
+        compiled.create_context(), config
+    )
+
+    action: Action = next(a for a in ctx.filter_actions() if a.input_params)
+    results["invoke_us"] = _best(lambda: action.invoke(ctx.params), 10_000) * 1e6
+
+    def run() -> None:
+        engine.run(Base(limit=config.steps))
+
+    results["steps_per_s"] = config.steps / _best(run, 1, 3)
+    return results
+
+
+def check(results: dict[str, float], thresholds: dict[str, dict[str, float]]) -> list[str]:
+    """Return a message for every result outside its threshold."""
+    failures = []
+    for metric, bound in thresholds.items():
+        value = results.get(metric)
+        if value is None:
+            continue
+        if "max" in bound and value > bound["max"]:
+            failures.append(f"{metric}: {value:.2f} > max {bound['max']}")
+        if "min" in bound and value < bound["min"]:
+            failures.append(f"{metric}: {value:.2f} < min {bound['min']}")
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    defaults = SyntheticConfig()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--actions", type=int, default=defaults.actions)
+    parser.add_argument("--params", type=int, default=defaults.params)
+    parser.add_argument("--inputs", type=int, default=defaults.inputs_per_action)
+    parser.add_argument("--deps", type=int, default=defaults.deps_per_input)
+    parser.add_argument("--cascade-ratio", type=float, default=defaults.cascade_ratio)
+    parser.add_argument("--steps", type=int, default=defaults.steps)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--out", type=Path, help="write the JSON report here")
+    parser.add_argument("--thresholds", type=Path, help="JSON regression thresholds")
+    args = parser.parse_args(argv)
+
+    config = SyntheticConfig(
+        actions=args.actions,
+        params=args.params,
+        inputs_per_action=args.inputs,
+        deps_per_input=args.deps,
+        cascade_ratio=args.cascade_ratio,
+        steps=args.steps,
+        seed=args.seed,
+    )
+    results = run_suite(config)
+    thresholds = json.loads(args.thresholds.read_text()) if args.thresholds else {}
+    failures = check(results, thresholds)
+
+    report = {
+        "config": asdict(config),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+        "failures": failures,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(text)
+    print(text)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
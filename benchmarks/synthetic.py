@@ -0,0 +1,89 @@
+"""
+Synthetic engines for benchmarking the orchestration layer without any LLM or
+network calls.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from typing import Annotated, Any, Callable
+
+from pydantic import BaseModel
+
+from action_engine import Action, Engine, Tag, Deps
+
+
+@dataclass(frozen=True)
+class SyntheticConfig:
+    """Shape of a generated engine."""
+
+    actions: int = 200
+    params: int = 50
+    inputs_per_action: int = 2
+    deps_per_input: int = 2
+    cascade_ratio: float = 0.2
+    steps: int = 1_000
+    seed: int = 0
+
+
+class Base(BaseModel):
+    steps: int = 0
+    limit: int = 0
+
+
+def stub_selector(base: Base, actions: list[Action]) -> Action:
+    """
+    Deterministic selector: walks the ready actions round-robin and picks the
+    terminal action once `base.limit` steps have been taken.
+    """
+    base.steps += 1
+    if base.steps >= base.limit:
+        return next(a for a in actions if a.final)
+    candidates = [a for a in actions if not a.final]
+    return candidates[base.steps % len(candidates)]
+
+
+def _make_fn(
+    name: str, inputs: dict[str, Any], output: Any | None
+) -> Callable[..., Any]:
+    def fn(**kwargs: Any) -> int:
+        return len(kwargs)
+
+    fn.__name__ = fn.__qualname__ = name
+    fn.__annotations__ = {"base": Base, **inputs}
+    fn.__annotations__["return"] = output if output is not None else None
+    return fn
+
+
+def build_functions(config: SyntheticConfig) -> list[Callable[..., Any]]:
+    """
+    Generate the action functions of a synthetic engine. Param `p{i}` only
+    declares Deps on params with a higher index, so the Deps graph is acyclic.
+    Every param has a producer, and `finish` is the only terminal action.
+    """
+    rng = random.Random(config.seed)
+    n = config.params
+    fns = []
+    for i in range(config.actions):
+        out = i % n
+        candidates = [j for j in range(n) if j != out]
+        inputs: dict[str, Any] = {}
+        for j in rng.sample(candidates, min(config.inputs_per_action, len(candidates))):
+            deps = [f"p{d}" for d in range(j + 1, min(j + 1 + config.deps_per_input, n))]
+            inputs[f"p{j}"] = Annotated[int, Deps(deps)]
+        cascade = rng.random() < config.cascade_ratio
+        output = Annotated[int, Tag(f"p{out}", cascade=cascade)]
+        fns.append(_make_fn(f"a{i}", inputs if i >= n else {}, output))
+    fns.append(_make_fn("finish", {}, None))
+    return fns
+
+
+def build_engine(
+    config: SyntheticConfig, fns: list[Callable[..., Any]] | None = None
+) -> Engine[Base]:
+    """Register the synthetic actions on a fresh engine."""
+    engine = Engine(Base, stub_selector)
+    for fn in fns or build_functions(config):
+        engine.action(terminal=fn.__name__ == "finish")(fn)
+    return engine
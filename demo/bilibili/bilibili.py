@@ -17,7 +17,7 @@ from pydantic import BaseModel, ConfigDict
 from action_engine import Action, Engine, Tag, Deps
 from inspect import cleandoc as I
 
-from demo.bilibili.memory import Fifo
+from action_engine.memory import LogWriter, Memory
 
 load_dotenv()
 SESSDATA = os.getenv("SESSDATA")
@@ -30,7 +30,7 @@ class Base(BaseModel):
     credential: Credential
     co: Client
     prompt: str = "You are browsing Bilibili, A Chinese video sharing platform."
-    memory: Fifo
+    memory: Memory
 
 
 class TargetComment(BaseModel):
@@ -219,10 +219,13 @@ async def reply_to_comment(base: Base, cmt: TargetComment, vid: Video) -> None:
 
 
 if __name__ == "__main__":
-    memory = Fifo()
+    memory = Memory(capacity=100, log=LogWriter("fifo_log.txt"))
     co = Client(os.environ.get("COHERE_API_KEY"))
     credential = Credential(sessdata=SESSDATA, bili_jct=BILI_JCT, buvid3=BUVID3)
     base = Base(credential=credential, co=co, memory=memory)
 
     print(engine.display())
-    engine.run(base)
+    try:
+        engine.run(base)
+    finally:
+        memory.close()
@@ -1,28 +1,35 @@
 import os
+from collections.abc import Iterator
 from typing import Annotated
 
 from cohere import Client
 from dotenv import load_dotenv
 from github import Github, Auth
 from github.Repository import Repository
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 from action_engine import Action, Engine, Tag
-from action_engine.utils import indexed_str
+from action_engine.utils import HistoryRenderer, indexed_candidates, indexed_str
 
 load_dotenv()
 
 class Base(BaseModel):
-    g: Github
     model_config = ConfigDict(arbitrary_types_allowed=True)
     history: list[str]
     llm: Client
     summary: str = ""
+    # One renderer per run, so each keeps the cached prompt of its own history
+    past_actions: HistoryRenderer = Field(
+        default_factory=lambda: HistoryRenderer("Past actions", budget=8000, head=1)
+    )
+    your_past_actions: HistoryRenderer = Field(
+        default_factory=lambda: HistoryRenderer("Your Past Actions", budget=8000, head=1)
+    )
 
 def action_selector(base: Base, actions: list[Action]) -> Action:
     target = "Goal: browse github repositories, for each repo, get three issues. When you are done, generate a summary. \n"
     postfix = "Pick your next action based on the past actions, give the index and nothing else.\n"
-    query = target + indexed_str("Past actions", base.history) + indexed_str("Possible actions", actions) + postfix
+    query = target + base.past_actions.render(base.history) + indexed_candidates("Possible actions", actions) + postfix
     response = base.llm.chat(message=query).text
     return actions[int(response)]
 
@@ -31,18 +38,24 @@ engine = Engine(
     base_action_selector=action_selector,
 )
 
+@engine.resource()
+def github() -> Iterator[Github]:
+    g = Github(auth=Auth.Token(os.environ["GITHUB_TOKEN"]))
+    yield g
+    g.close()
+
 @engine.action()
-def browse_repo(base: Base) -> Annotated[Repository, Tag("repo")]:
-    message = indexed_str("Your Past Actions", base.history) + "Give me a keyword about ai and nothing else:"
+def browse_repo(base: Base, github: Github) -> Annotated[Repository, Tag("repo")]:
+    message = base.your_past_actions.render(base.history) + "Give me a keyword about ai and nothing else:"
     query = base.llm.chat(message=message).text
-    repo = base.g.search_repositories(query=query).get_page(0)[0]
+    repo = github.search_repositories(query=query).get_page(0)[0]
     base.history.append(f"Browsing repository {repo.name}: {repo.description}")
     return repo
 
 @engine.action()
 def get_issue(base: Base, repo: Repository) -> None:
     issues = repo.get_issues().get_page(0)[:10]
-    history = indexed_str("Your Past Actions", base.history)
+    history = base.your_past_actions.render(base.history)
     postfix = "Your response should be a number and nothing else."
     response = base.llm.chat(message=history + "Now, pick a new issue:" + indexed_str("Issues", issues) + postfix).text
     base.history.append(f"Retrieved issue: {issues[int(response)].title}")
@@ -55,7 +68,7 @@ if __name__ == "__main__":
     base = Base(
         history=[],
         llm=Client(os.environ.get("COHERE_API_KEY")),
-        g=Github(auth=Auth.Token(os.environ["GITHUB_TOKEN"]))
     )
     engine.run(base)
+    engine.shutdown()
     print(base.summary)
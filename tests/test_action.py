@@ -1,6 +1,7 @@
 """Tests for the Action class."""
 
 from __future__ import annotations
+import asyncio
 from typing import Annotated, Any, List
 from action_engine.action import Action
 from action_engine.param import Param, StatefulParamSet
@@ -57,3 +58,52 @@ def test_action_extraction_and_invocation() -> None:
     out_param, value = output[0]
     assert out_param.name == "result"
     assert value == 15
+
+
+async def dummy_async_function(
+    base: int, increment: Annotated[int, Deps([])]
+) -> Annotated[int, Tag("result", cascade=False)]:
+    return base + increment
+
+
+def test_action_ainvoke_awaits_on_running_loop() -> None:
+    """
+    Test that ainvoke awaits coroutine functions on the caller's loop,
+    so it can be used where asyncio.run would fail.
+    """
+    action: Action = Action(
+        dummy_async_function, final=False, description="async dummy action"
+    )
+    param_set: StatefulParamSet = StatefulParamSet([])
+    param_set.set_state(Param(name="base", type_=int), 1)
+    param_set.set_state(Param(name="increment", type_=int), 2)
+
+    async def main() -> list:
+        loop = asyncio.get_running_loop()
+        output = await action.ainvoke(param_set)
+        assert asyncio.get_running_loop() is loop
+        return output
+
+    output = asyncio.run(main())
+    assert [(p.name, v) for p, v in output] == [("result", 3)]
+
+
+def split_action_function(
+    base: int,
+) -> tuple[Annotated[int, Tag("quotient")], Annotated[int, Tag("remainder")]]:
+    return divmod(base, 3)
+
+
+def test_action_tuple_outputs_reuse_declared_params() -> None:
+    """
+    Test that tuple return annotations yield one output per element and that
+    invoking returns the params declared at registration, not fresh copies.
+    """
+    action: Action = Action(split_action_function, final=False, description="")
+    assert [p.name for p in action.output_params] == ["quotient", "remainder"]
+
+    param_set: StatefulParamSet = StatefulParamSet([])
+    param_set.set_state(Param(name="base", type_=int), 7)
+    output = action.invoke(param_set)
+    assert [(p.name, v) for p, v in output] == [("quotient", 2), ("remainder", 1)]
+    assert all(p is q for (p, _), q in zip(output, action.output_params))
@@ -0,0 +1,69 @@
+"""Tests for batching selector calls across concurrent runs."""
+
+from __future__ import annotations
+import asyncio
+from typing import Annotated
+from pydantic import BaseModel
+from action_engine.action import Action
+from action_engine.batching import BatchActionSelector
+from action_engine.engine import Engine, Selection
+from action_engine.param_functions import Tag
+
+
+class DummyState(BaseModel):
+    n: int
+
+
+class RecordingSelector(BatchActionSelector[DummyState]):
+    def __init__(self) -> None:
+        self.batches: list[list[int]] = []
+
+    async def select_batch(
+        self, requests: list[tuple[DummyState, list[Action]]]
+    ) -> list[Selection]:
+        self.batches.append([base.n for base, _ in requests])
+        selections: list[Selection] = []
+        for _, actions in requests:
+            names = [a.name for a in actions]
+            selections.append(actions[names.index("finish" if "finish" in names else "load")])
+        return selections
+
+
+def build_engine(selector: RecordingSelector, **kwargs: float) -> Engine[DummyState]:
+    engine: Engine[DummyState] = Engine(DummyState, selector, **kwargs)  # type: ignore[arg-type]
+
+    @engine.action()
+    def load(base: DummyState) -> Annotated[int, Tag("value")]:
+        return base.n
+
+    @engine.action(terminal=True)
+    def finish(base: DummyState, value: int) -> None:
+        pass
+
+    return engine
+
+
+def test_concurrent_runs_share_batches() -> None:
+    """Selections of concurrent runs are batched and scattered back to each run."""
+    selector = RecordingSelector()
+    engine = build_engine(selector, batch_window=10.0, max_batch_size=4)
+
+    async def main() -> list[int]:
+        ctxs = await asyncio.gather(*(engine.arun(DummyState(n=i)) for i in range(4)))
+        return [ctx.params.get_state("value") for ctx in ctxs]
+
+    assert asyncio.run(main()) == [0, 1, 2, 3]
+    assert selector.batches == [[0, 1, 2, 3], [0, 1, 2, 3]]
+    stats = engine.batch_stats
+    assert (stats.batches, stats.requests, stats.full_batches) == (2, 8, 2)
+    assert stats.occupancy == 1.0
+
+
+def test_window_flushes_partial_batch() -> None:
+    """A batch that does not fill up is sent once the window has passed."""
+    selector = RecordingSelector()
+    engine = build_engine(selector, batch_window=0.001, max_batch_size=8)
+
+    engine.run(DummyState(n=7))
+    assert selector.batches == [[7], [7]]
+    assert engine.batch_stats.occupancy == 1 / 8
@@ -0,0 +1,24 @@
+"""Smoke test for the offline benchmark suite."""
+
+from __future__ import annotations
+from benchmarks.suite import check, run_suite
+from benchmarks.synthetic import SyntheticConfig
+
+
+def test_benchmark_suite_runs_on_a_small_engine() -> None:
+    """
+    Verify that every metric is produced on a tiny synthetic engine and that
+    thresholds flag results on the wrong side of their bound.
+    """
+    results = run_suite(SyntheticConfig(actions=20, params=8, steps=50))
+    assert set(results) >= {
+        "register_ms",
+        "filter_us",
+        "cascade_us",
+        "invoke_us",
+        "steps_per_s",
+    }
+    assert check(results, {"steps_per_s": {"min": 0}, "filter_us": {"max": 1e9}}) == []
+    assert check({"invoke_us": 5.0}, {"invoke_us": {"max": 1}}) == [
+        "invoke_us: 5.00 > max 1"
+    ]
@@ -0,0 +1,91 @@
+"""Tests for per-action result caching."""
+
+from __future__ import annotations
+import time
+from pathlib import Path
+from typing import Annotated
+import pytest
+from action_engine.action import Action
+from action_engine.cache import CachePolicy, DiskCacheStore, MemoryCacheStore
+from action_engine.param import Param, StatefulParamSet
+from action_engine.param_functions import Tag
+
+calls: list[str] = []
+
+
+def get_issue(base: object, repo: str) -> Annotated[str, Tag("issue")]:
+    calls.append(repo)
+    return f"issue of {repo}"
+
+
+def test_action_cache_hits_on_same_inputs() -> None:
+    """
+    Verify that the function only runs once per distinct input, that the
+    base state is left out of the key, and that hits/misses are counted.
+    """
+    calls.clear()
+    action: Action = Action(
+        get_issue, final=False, description="", cache=CachePolicy(maxsize=8)
+    )
+    state = StatefulParamSet([])
+    state.set_state(Param(name="base", type_=object), object())
+    state.set_state(Param(name="repo", type_=str), "a")
+    assert action.invoke(state)[0][1] == "issue of a"
+
+    state.set_state(Param(name="base", type_=object), object())
+    assert action.invoke(state)[0][1] == "issue of a"
+    state.set_state(Param(name="repo", type_=str), "b")
+    assert action.invoke(state)[0][1] == "issue of b"
+
+    assert calls == ["a", "b"]
+    assert (action.cache_store.hits, action.cache_store.misses) == (1, 2)
+
+
+def test_memory_cache_store_ttl_and_lru() -> None:
+    """
+    Verify that entries expire after their ttl and that the least recently
+    used entry is evicted first.
+    """
+    store = MemoryCacheStore(maxsize=2)
+    store.set("a", 1, ttl=None)
+    store.set("b", 2, ttl=None)
+    store.get("a")
+    store.set("c", 3, ttl=None)
+    assert store.get("b") == (False, None)
+    assert store.get("a") == (True, 1)
+
+    store.set("d", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert store.get("d") == (False, None)
+
+
+def test_disk_cache_store_persists(tmp_path: Path) -> None:
+    """
+    Verify that the SQLite store keeps values across instances and evicts
+    beyond maxsize.
+    """
+    path = tmp_path / "cache.sqlite"
+    store = DiskCacheStore(path, maxsize=2)
+    store.set("a", {"x": 1}, ttl=None)
+    store.set("b", 2, ttl=None)
+    store.set("c", 3, ttl=None)
+    store.close()
+
+    store = DiskCacheStore(path, maxsize=2)
+    assert store.get("a") == (False, None)
+    assert store.get("c") == (True, 3)
+    store.close()
+
+
+def test_unfingerprintable_input_is_reported() -> None:
+    """
+    Verify that an input that cannot be hashed into a key names the action.
+    """
+    action: Action = Action(
+        get_issue, final=False, description="", cache=CachePolicy(exclude=[])
+    )
+    state = StatefulParamSet([])
+    state.set_state(Param(name="base", type_=object), lambda: None)
+    state.set_state(Param(name="repo", type_=str), "a")
+    with pytest.raises(TypeError, match="get_issue cannot be fingerprinted"):
+        action.invoke(state)
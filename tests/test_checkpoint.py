@@ -0,0 +1,136 @@
+"""Tests for checkpointing and resuming runs."""
+
+from __future__ import annotations
+import threading
+from pathlib import Path
+from typing import Annotated, Any, List
+import pytest
+from pydantic import BaseModel
+from action_engine.action import Action
+from action_engine.checkpoint import (
+    Checkpointer,
+    PickleCheckpointer,
+    Snapshot,
+    SqliteCheckpointer,
+)
+from action_engine.engine import Engine
+from action_engine.param_functions import Tag, Deps
+
+
+class DummyState(BaseModel):
+    crash_at: int = -1
+    calls: list[str] = []
+
+
+class RecordingCheckpointer(Checkpointer):
+    def __init__(self, inner: Checkpointer) -> None:
+        self.inner = inner
+        self.deltas: list[tuple[int, set[str], set[str]]] = []
+
+    def save(
+        self,
+        run_id: str,
+        step: int,
+        changed: dict[str, tuple[type, Any]],
+        removed: set[str],
+        final: bool = False,
+    ) -> None:
+        self.deltas.append((step, set(changed), removed))
+        self.inner.save(run_id, step, changed, removed, final)
+
+    def load(self, run_id: str) -> Snapshot | None:
+        return self.inner.load(run_id)
+
+
+def build_engine(checkpointer: Checkpointer) -> Engine[DummyState]:
+    def action_selector(base: DummyState, actions: List[Action]) -> Action:
+        names = [a.name for a in actions]
+        for name in ("finish", "count", "load"):
+            if name in names:
+                return actions[names.index(name)]
+        raise AssertionError(names)
+
+    engine: Engine[DummyState] = Engine(
+        DummyState, action_selector, checkpointer=checkpointer
+    )
+
+    @engine.action()
+    def load(base: DummyState) -> Annotated[str, Tag("repo", cascade=True)]:
+        base.calls.append("load")
+        return "repo"
+
+    @engine.action()
+    def count(
+        base: DummyState, repo: Annotated[str, Deps(["issues"])]
+    ) -> Annotated[list[int], Tag("issues")]:
+        base.calls.append("count")
+        if len(base.calls) == base.crash_at:
+            raise RuntimeError("crash")
+        return [1, 2, 3]
+
+    @engine.action(terminal=True)
+    def finish(base: DummyState, issues: list[int]) -> None:
+        base.calls.append("finish")
+
+    return engine
+
+
+@pytest.mark.parametrize("kind", ["pickle", "sqlite"])
+def test_resume_from_latest_checkpoint(tmp_path: Path, kind: str) -> None:
+    """
+    Test that a crashed run resumes from its last checkpoint without
+    replaying completed actions, that each checkpoint only carries the
+    params changed since the previous one, and that a finished run is not
+    resumed.
+    """
+    inner: Checkpointer = (
+        PickleCheckpointer(tmp_path)
+        if kind == "pickle"
+        else SqliteCheckpointer(tmp_path / "ckpt.sqlite")
+    )
+    checkpointer = RecordingCheckpointer(inner)
+    engine = build_engine(checkpointer)
+
+    run_ids: set[str] = set()
+    engine.add_listener(lambda event: run_ids.add(event.run_id))
+    with pytest.raises(RuntimeError):
+        engine.run(DummyState(crash_at=2))
+    assert checkpointer.deltas == [(1, {"repo"}, set())]
+    (run_id,) = run_ids
+
+    resumed = DummyState()
+    ctx = engine.resume(run_id, resumed)
+    assert ctx.run_id == run_id
+    assert resumed.calls == ["count", "finish"]
+    assert ctx.step == 3
+    assert checkpointer.deltas[1:] == [(2, {"issues"}, set()), (3, set(), set())]
+
+    snapshot = inner.load(run_id)
+    assert snapshot is not None
+    assert snapshot.step == 3
+    assert snapshot.params == {"repo": (str, "repo"), "issues": (list, [1, 2, 3])}
+    assert snapshot.final
+
+    # Resuming a finished run does not invoke its actions again
+    again = DummyState()
+    ctx = engine.resume(run_id, again)
+    assert again.calls == []
+    assert ctx.step == 3
+    assert ctx.params.get_state("issues") == [1, 2, 3]
+    assert len(checkpointer.deltas) == 3
+
+
+def test_unpicklable_params_and_truncated_tail(tmp_path: Path) -> None:
+    """Unpicklable params are dropped and a delta cut off by a crash is ignored."""
+    checkpointer = PickleCheckpointer(tmp_path)
+    checkpointer.save("run", 1, {"repo": (str, "a"), "lock": (str, "free")}, set())
+    lock = threading.Lock()
+    checkpointer.save("run", 2, {"repo": (str, "b"), "lock": (type(lock), lock)}, set())
+    checkpointer.save("run", 3, {"repo": (str, "c")}, set())
+    path = tmp_path / "run.ckpt"
+    path.write_bytes(path.read_bytes()[:-5])
+
+    snapshot = checkpointer.load("run")
+    assert snapshot is not None
+    assert snapshot.step == 2
+    assert snapshot.params == {"repo": (str, "b")}
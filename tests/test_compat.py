@@ -0,0 +1,46 @@
+"""Tests for the type compatibility table and value validation."""
+
+from __future__ import annotations
+from typing import Annotated, Any, Optional
+from action_engine.compat import compatible, validate
+from action_engine.param_functions import Tag
+
+
+class Video:
+    pass
+
+
+class Clip(Video):
+    pass
+
+
+def test_compatible_handles_unions_and_annotated() -> None:
+    """
+    Verify producer-side unions drop None, consumer-side unions accept any
+    member, and Annotated metadata is ignored.
+    """
+    assert compatible(Video, Video)
+    assert compatible(Clip, Video)
+    assert not compatible(Video, Clip)
+    assert compatible(Video | None, Video)
+    assert compatible(Optional[Clip], Video)
+    assert not compatible(Video | int, Video)
+    assert compatible(int, int | str)
+    assert compatible(Annotated[Clip, Tag("vid")], Annotated[Video, "x"])
+    assert compatible(list[int], list[str])
+    assert compatible(int, Any)
+
+
+def test_validate_strictness() -> None:
+    """
+    Verify that "shallow" checks the outer type only, "deep" also checks
+    items, and "off" accepts anything.
+    """
+    value = [1, "two"]
+    assert validate(value, list[int], "shallow")
+    assert not validate(value, list[int], "deep")
+    assert validate({"a": (1, 2.0)}, dict[str, tuple[int, float]], "deep")
+    assert not validate({"a": (1, 2)}, dict[str, tuple[int, float]], "deep")
+    assert validate(Clip(), Video | None, "shallow")
+    assert not validate("x", Video | None, "shallow")
+    assert validate("x", int, "off")
@@ -1,12 +1,15 @@
 """Tests for the Engine class and its action registration/invocation flow."""
 
 from __future__ import annotations
-from typing import List, Annotated, cast
+import asyncio
+import threading
+import time
+from typing import List, Annotated
 import pytest
 from pydantic import BaseModel
 from action_engine.engine import Engine
 from action_engine.action import Action
-from action_engine.param import Param, ParamSet, InputParam
+from action_engine.param import Param
 from action_engine.param_functions import Tag, Deps
 
 
@@ -27,7 +30,7 @@ def dummy_engine() -> Engine[DummyState]:
     otherwise, it selects the first action.
     """
 
-    def action_selector(actions: List[Action]) -> Action:
+    def action_selector(base: DummyState, actions: List[Action]) -> Action:
         for act in actions:
             if act.name == "finish":
                 return act
@@ -62,36 +65,268 @@ def test_engine_run(dummy_engine: Engine[DummyState]) -> None:
     assert state.counter == 1
 
 
+def test_engine_arun_with_async_actions_and_selector() -> None:
+    """
+    Test that arun awaits async actions and async selectors on a single
+    event loop shared by every step.
+    """
+    loops: set[int] = set()
+
+    async def action_selector(base: DummyState, actions: List[Action]) -> Action:
+        loops.add(id(asyncio.get_running_loop()))
+        for act in actions:
+            if act.name == "finish" and base.counter >= 3:
+                return act
+        return actions[0]
+
+    engine: Engine[DummyState] = Engine(DummyState, action_selector)
+
+    @engine.action()
+    async def increment(base: DummyState) -> Annotated[int, Tag("counter")]:
+        loops.add(id(asyncio.get_running_loop()))
+        base.counter += 1
+        return base.counter
+
+    @engine.action(terminal=True)
+    async def finish(base: DummyState, counter: int) -> None:
+        base.finished = True
+
+    state = DummyState()
+    asyncio.run(engine.arun(state))
+    assert state.finished is True
+    assert state.counter == 3
+    assert len(loops) == 1
+
+
 def test_engine_cascade() -> None:
     """
     Test the engine's internal cascade functionality.
-    When an output parameter with cascade=True is updated with a removal signal,
+    When an output parameter with cascade=True is updated,
     all dependent parameters are removed recursively.
     """
-    engine: Engine[DummyState] = Engine(DummyState, lambda acts: acts[0])
-    # Manually add a parameter "dependent" to the engine's state.
-    engine._params.set_state(Param(name="dependent", type_=int), 100)
+    engine: Engine[DummyState] = Engine(DummyState, lambda base, acts: acts[0])
+
+    @engine.action()
+    def consume_trigger(trigger: Annotated[int, Deps(["dependent"])]) -> None:
+        pass
+
+    @engine.action()
+    def consume_dependent(dependent: Annotated[int, Deps(["leaf"])]) -> None:
+        pass
 
-    # Create a dummy input parameter "trigger" whose metadata indicates it depends on "dependent".
-    dummy_input_param: InputParam = InputParam(
-        name="trigger", type_=int, deps=["dependent"]
+    # Manually add the dependent parameters to a run's state.
+    ctx = engine.create_context()
+    ctx.params.set_state(Param(name="dependent", type_=int), 100)
+    ctx.params.set_state(Param(name="leaf", type_=int), 200)
+
+    # Invoke cascade on "trigger" so that parameters dependent on it are removed.
+    ctx.cascade("trigger")
+    # Verify that both dependent parameters have been removed.
+    assert ctx.params.get_state("dependent") is None
+    assert ctx.params.get_state("leaf") is None
+
+
+def test_engine_rejects_cyclic_deps() -> None:
+    """
+    Test that registering an action which closes a Deps cycle raises instead
+    of recursing forever on the next cascade, and leaves the engine unchanged.
+    """
+    engine: Engine[DummyState] = Engine(DummyState, lambda base, acts: acts[0])
+
+    @engine.action()
+    def consume_a(a: Annotated[int, Deps(["b"])]) -> None:
+        pass
+
+    with pytest.raises(ValueError, match="Cyclic"):
+
+        @engine.action()
+        def consume_b(b: Annotated[int, Deps(["a"])]) -> None:
+            pass
+
+    assert list(engine.actions) == ["consume_a"]
+    assert engine.cascades == {"a": ("b",)}
+
+
+def test_reregistering_replaces_deps() -> None:
+    """A re-registered action's old Deps no longer cascade, others' still do."""
+    engine: Engine[DummyState] = Engine(DummyState, lambda base, acts: acts[0])
+
+    @engine.action()
+    def first(a: Annotated[int, Deps(["b"])], b: Annotated[int, Deps(["c"])]) -> None:
+        pass
+
+    @engine.action()
+    def second(a: Annotated[int, Deps(["d"])]) -> None:
+        pass
+
+    assert engine.cascades == {"a": ("b", "c", "d"), "b": ("c",)}
+
+    @engine.action()
+    def first(a: int, b: int) -> None:  # type: ignore[no-redef]
+        pass
+
+    assert engine.cascades == {"a": ("d",)}
+
+
+def test_engine_runs_are_isolated() -> None:
+    """
+    Test that concurrent runs on one engine each get their own state, and
+    that nothing leaks into the next run.
+    """
+
+    async def action_selector(base: DummyState, actions: List[Action]) -> Action:
+        await asyncio.sleep(0)
+        for act in actions:
+            if act.name == "finish" and base.counter >= 3:
+                return act
+        return actions[0]
+
+    engine: Engine[DummyState] = Engine(DummyState, action_selector)
+
+    @engine.action()
+    async def increment(base: DummyState) -> Annotated[int, Tag("counter")]:
+        await asyncio.sleep(0)
+        base.counter += 1
+        return base.counter
+
+    @engine.action(terminal=True)
+    def finish(base: DummyState, counter: int) -> None:
+        base.finished = True
+
+    async def main() -> list:
+        return await asyncio.gather(*(engine.arun(DummyState()) for _ in range(10)))
+
+    contexts = asyncio.run(main())
+    assert len({ctx.run_id for ctx in contexts}) == 10
+    for ctx in contexts:
+        assert ctx.base_state.finished is True
+        assert ctx.params.get_state("counter") == 3
+
+    assert "counter" not in engine.create_context().params
+
+
+def test_engine_fan_out() -> None:
+    """
+    Test that a selector may return several actions: independent ones run
+    concurrently, and conflicting ones are ordered into later waves.
+    """
+    in_flight: list[int] = [0, 0]
+
+    def action_selector(base: DummyState, actions: List[Action]) -> List[Action]:
+        if base.counter == 0:
+            return [a for a in actions if a.name.startswith("fetch")]
+        return [a for a in actions if a.name == "finish"]
+
+    engine: Engine[DummyState] = Engine(DummyState, action_selector)
+
+    async def fetch(base: DummyState) -> None:
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight)
+        await asyncio.sleep(0.01)
+        in_flight[0] -= 1
+        base.counter += 1
+
+    @engine.action()
+    async def fetch_a(base: DummyState) -> Annotated[int, Tag("a")]:
+        await fetch(base)
+        return 1
+
+    @engine.action()
+    async def fetch_b(base: DummyState) -> Annotated[int, Tag("b")]:
+        await fetch(base)
+        return 2
+
+    @engine.action()
+    async def fetch_c(base: DummyState) -> Annotated[int, Tag("c")]:
+        await fetch(base)
+        return 3
+
+    @engine.action(terminal=True)
+    def finish(base: DummyState, a: int, b: int, c: int) -> None:
+        base.finished = True
+
+    state = DummyState()
+    ctx = engine.run(state)
+    assert state.finished is True
+    assert state.counter == 3
+    assert in_flight[1] == 3
+    assert [ctx.params.get_state(n) for n in "abc"] == [1, 2, 3]
+
+    # finish reads the outputs of every fetch, so it must run after fetch_a and
+    # fetch_b, and fetch_c, selected after it, must not overtake it.
+    waves = engine.partition([fetch_a, fetch_b, finish, fetch_c])
+    assert waves == [[fetch_a, fetch_b], [finish], [fetch_c]]
+
+
+def test_engine_thread_executor_keeps_loop_free() -> None:
+    """
+    Test that blocking actions declared with executor="thread" run on the
+    engine's pool while the event loop keeps serving other tasks.
+    """
+    engine: Engine[DummyState] = Engine(
+        DummyState, lambda base, acts: acts[0], max_workers=4
     )
-    dummy_param_set: ParamSet[InputParam] = ParamSet([dummy_input_param])
+    threads: set[str] = set()
 
-    # Create a dummy action with these input parameters.
-    class DummyAction:
-        def __init__(self, inputs: ParamSet[InputParam]) -> None:
-            self._input_params = inputs
+    @engine.action(terminal=True, executor="thread")
+    def blocking(base: DummyState) -> None:
+        threads.add(threading.current_thread().name)
+        time.sleep(0.05)
+        base.finished = True
 
-        @property
-        def input_params(self) -> ParamSet[InputParam]:
-            return self._input_params
+    async def main() -> int:
+        ticks = 0
 
-    dummy_action = DummyAction(dummy_param_set)
-    # Cast dummy_action to Action since Engine expects actions of type Action.
-    engine.actions["dummy"] = cast(Action, dummy_action)
+        async def heartbeat() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
 
-    # Invoke cascade on "trigger" so that parameters dependent on it are removed.
-    engine._cascade("trigger")
-    # Verify that the "dependent" parameter has been removed.
-    assert engine._params.get_state("dependent") is None
+        beat = asyncio.create_task(heartbeat())
+        await asyncio.gather(*(engine.arun(DummyState()) for _ in range(4)))
+        beat.cancel()
+        return ticks
+
+    assert asyncio.run(main()) > 3
+    assert all(name.startswith("action_engine") for name in threads)
+    engine.shutdown()
+
+
+def test_engine_speculative_actions_run_during_selection() -> None:
+    """
+    Speculative actions start while the selector decides; the selected one's
+    result is used and the others are cancelled.
+    """
+    events: list[str] = []
+
+    async def action_selector(base: DummyState, actions: List[Action]) -> Action:
+        await asyncio.sleep(0.01)
+        events.append("selected")
+        names = [a.name for a in actions]
+        return actions[names.index("finish" if "finish" in names else "get_issue")]
+
+    engine = Engine(DummyState, action_selector)
+
+    @engine.action(speculative=True)
+    async def get_issue(base: DummyState) -> Annotated[str, Tag("issue")]:
+        events.append("get_issue started")
+        return "issue"
+
+    @engine.action(speculative=True)
+    async def read_comments(base: DummyState) -> Annotated[int, Tag("comments")]:
+        events.append("read_comments started")
+        await asyncio.sleep(10)
+        events.append("read_comments finished")
+        return 1
+
+    @engine.action(terminal=True)
+    def finish(base: DummyState, issue: str) -> None:
+        base.finished = True
+
+    ctx = engine.run(DummyState())
+    assert ctx.base_state.finished
+    assert ctx.params.get_state("issue") == "issue"
+    assert "comments" not in ctx.params
+    assert events[:3] == ["get_issue started", "read_comments started", "selected"]
+    assert "read_comments finished" not in events
@@ -0,0 +1,73 @@
+"""Tests for generator actions and the Engine.astream event stream."""
+
+from __future__ import annotations
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from typing import Annotated, List
+from pydantic import BaseModel
+from action_engine.action import Action
+from action_engine.engine import Engine
+from action_engine.events import CompleteEvent, OutputEvent, RunEvent, StepEvent
+from action_engine.param import StatefulParamSet, Param
+from action_engine.param_functions import Tag
+
+
+class DummyState(BaseModel):
+    pages: int = 3
+
+
+def test_generator_action_yields_outputs() -> None:
+    """A generator action declares its outputs through the yield type."""
+
+    def search(base: DummyState) -> Iterator[Annotated[int, Tag("page")]]:
+        yield from range(base.pages)
+
+    action = Action(search, final=False, description="")
+    assert action.streaming
+    assert [p.name for p in action.output_params] == ["page"]
+
+    state = StatefulParamSet([])
+    state.set_state(Param.of("base", DummyState), DummyState())
+    assert [v for _, v in action.invoke(state)] == [0, 1, 2]
+
+
+def test_engine_astream_yields_events() -> None:
+    """Each yield of an async generator action is applied and streamed as it happens."""
+
+    def action_selector(base: DummyState, actions: List[Action]) -> Action:
+        return next(a for a in actions if a.name == "finish")
+
+    engine = Engine(DummyState, action_selector)
+
+    @engine.action()
+    async def search(base: DummyState) -> AsyncIterator[Annotated[int, Tag("page")]]:
+        for i in range(base.pages):
+            await asyncio.sleep(0)
+            yield i
+
+    @engine.action(terminal=True)
+    def finish(base: DummyState, page: int) -> Annotated[str, Tag("summary")]:
+        return f"{page + 1} pages"
+
+    async def main() -> list[RunEvent]:
+        return [e async for e in engine.astream(DummyState(), search)]
+
+    events = asyncio.run(main())
+    simple = [
+        (type(e).__name__, e.step, getattr(e, "param", None), getattr(e, "value", None))
+        for e in events
+    ]
+    assert simple == [
+        ("StepEvent", 0, None, None),
+        ("OutputEvent", 0, "page", 0),
+        ("OutputEvent", 0, "page", 1),
+        ("OutputEvent", 0, "page", 2),
+        ("StepEvent", 1, None, None),
+        ("OutputEvent", 1, "summary", "3 pages"),
+        ("CompleteEvent", 1, None, None),
+    ]
+    assert isinstance(events[0], StepEvent) and events[0].actions == ["search"]
+    assert isinstance(events[1], OutputEvent) and events[1].action == "search"
+    complete = events[-1]
+    assert isinstance(complete, CompleteEvent)
+    assert complete.context.params.get_state("summary") == "3 pages"
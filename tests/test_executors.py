@@ -0,0 +1,103 @@
+"""Tests for the worker pools used to run actions off the event loop."""
+
+from __future__ import annotations
+import asyncio
+import threading
+from typing import Annotated
+import pytest
+from action_engine.action import Action
+from action_engine.executors import BoundedThreadPool, ProcessPool
+from action_engine.param import Param, StatefulParamSet
+from action_engine.param_functions import Tag
+
+
+def test_bounded_thread_pool_reports_queue_depth() -> None:
+    """
+    Verify that calls beyond max_workers wait in the queue and are counted.
+    """
+    pool = BoundedThreadPool(max_workers=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def block() -> int:
+        started.set()
+        release.wait()
+        return 1
+
+    futures = [pool.submit(block) for _ in range(3)]
+    started.wait()
+    assert pool.running == 1
+    assert pool.queue_depth == 2
+
+    release.set()
+    assert [f.result() for f in futures] == [1, 1, 1]
+    assert pool.running == 0
+    assert pool.queue_depth == 0
+    pool.shutdown()
+
+
+def test_bounded_thread_pool_forgets_cancelled_calls() -> None:
+    """A call cancelled before it starts leaves the queue."""
+    pool = BoundedThreadPool(max_workers=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def block() -> int:
+        started.set()
+        release.wait()
+        return 1
+
+    async def main() -> None:
+        loop = asyncio.get_running_loop()
+        first = loop.run_in_executor(pool, block)
+        second = loop.run_in_executor(pool, block)
+        await asyncio.to_thread(started.wait)
+        assert pool.queue_depth == 1
+        second.cancel()
+        await asyncio.sleep(0)  # let the cancellation reach the pool
+        release.set()
+        assert await first == 1
+        with pytest.raises(asyncio.CancelledError):
+            await second
+
+    asyncio.run(main())
+    assert pool.running == 0
+    assert pool.queue_depth == 0
+    pool.shutdown()
+
+
+def square(x: int) -> Annotated[int, Tag("y")]:
+    return x * x
+
+
+def describe(x: object) -> None:
+    pass
+
+
+def test_process_action_round_trip() -> None:
+    """
+    Verify that a process action receives its inputs and returns its outputs
+    through the pool, and that warm-up starts every worker up front.
+    """
+    action: Action = Action(square, final=False, description="", executor="process")
+    state = StatefulParamSet([])
+    state.set_state(Param(name="x", type_=int), 7)
+
+    pool = ProcessPool(max_workers=2, warmup=True)
+    assert len(pool._pool._processes) == 2
+    output = asyncio.run(action.ainvoke(state, pool))
+    assert [(p.name, v) for p, v in output] == [("y", 49)]
+    pool.shutdown()
+
+
+def test_process_action_reports_unpicklable_param() -> None:
+    """
+    Verify that an unpicklable input is reported by name before anything is
+    sent to a worker.
+    """
+    action: Action = Action(describe, final=False, description="", executor="process")
+    state = StatefulParamSet([])
+    state.set_state(Param(name="x", type_=object), threading.Lock())
+
+    with pytest.raises(TypeError, match="param 'x' of type lock is not picklable"):
+        asyncio.run(action.ainvoke(state, None))
@@ -0,0 +1,59 @@
+"""Tests for the Graph used as the engine's action DAG."""
+
+from __future__ import annotations
+from typing import Annotated
+import pytest
+from pydantic import BaseModel
+from action_engine.engine import Engine
+from action_engine.param_functions import Tag
+
+
+class DummyState(BaseModel):
+    pass
+
+
+def test_engine_dag_merges_shared_params() -> None:
+    """Actions sharing several params are joined by one edge carrying every label."""
+    engine: Engine[DummyState] = Engine(DummyState, lambda base, acts: acts[0])
+
+    @engine.action()
+    def load(base: DummyState) -> tuple[
+        Annotated[str, Tag("repo")], Annotated[int, Tag("issue")]
+    ]:
+        return "repo", 1
+
+    @engine.action()
+    def summarize(base: DummyState, repo: str, issue: int) -> Annotated[str, Tag("summary")]:
+        return f"{repo}#{issue}"
+
+    @engine.action(terminal=True)
+    def finish(base: DummyState, summary: str) -> None:
+        pass
+
+    dag = engine.dag
+    assert dag.get_neighbors(load) == [summarize]
+    assert dag.edges[(load, summarize)] == ["repo", "issue"]
+    assert dag.get_predecessors(finish) == [summarize]
+    assert dag.topological_order() == [load, summarize, finish]
+    assert dag.reachable(load) == {summarize, finish}
+
+    dag.remove_node(summarize)
+    assert dag.reachable(load) == frozenset()
+    assert dag.get_predecessors(finish) == []
+
+
+def test_topological_order_rejects_cycles() -> None:
+    """A cycle between actions has no topological order."""
+    engine: Engine[DummyState] = Engine(DummyState, lambda base, acts: acts[0])
+
+    @engine.action()
+    def ask(base: DummyState, answer: str) -> Annotated[str, Tag("question")]:
+        return "?"
+
+    @engine.action()
+    def reply(base: DummyState, question: str) -> Annotated[str, Tag("answer")]:
+        return "!"
+
+    assert engine.dag.reachable(ask) == {ask, reply}
+    with pytest.raises(ValueError):
+        engine.dag.topological_order()
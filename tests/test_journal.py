@@ -0,0 +1,112 @@
+"""Tests for recording and replaying run journals."""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Annotated, List
+from pydantic import BaseModel
+from action_engine.action import Action
+from action_engine.engine import Engine
+from action_engine.journal import JournalStore
+from action_engine.param_functions import Tag
+
+
+class DummyState(BaseModel):
+    calls: list[str] = []
+
+
+def build_engine(store: JournalStore) -> tuple[Engine[DummyState], Action]:
+    def action_selector(base: DummyState, actions: List[Action]) -> Action:
+        base.calls.append("select")
+        names = [a.name for a in actions]
+        return actions[names.index("finish" if "finish" in names else "double")]
+
+    engine: Engine[DummyState] = Engine(DummyState, action_selector, journal=store)
+
+    @engine.action()
+    def start(base: DummyState, n: int) -> Annotated[int, Tag("x")]:
+        base.calls.append("start")
+        return n
+
+    @engine.action()
+    def double(base: DummyState, x: int) -> Annotated[int, Tag("total")]:
+        base.calls.append("double")
+        return x * 2
+
+    @engine.action(terminal=True)
+    def finish(base: DummyState, total: int) -> None:
+        base.calls.append("finish")
+
+    return engine, start
+
+
+def test_replay_skips_selector_and_actions(tmp_path: Path) -> None:
+    """A replay that follows the journal calls neither the selector nor the actions."""
+    engine, start = build_engine(JournalStore(tmp_path))
+    recorded = engine.run(DummyState(), start, n=3)
+
+    base = DummyState()
+    ctx = engine.replay(recorded.run_id, base, start, n=3)
+    assert ctx.journal is not None and ctx.journal.diverged_at is None
+    assert base.calls == []
+    assert ctx.params.get_state("total") == 6
+
+
+def test_replay_diverges_to_live_execution(tmp_path: Path) -> None:
+    """Different inputs make the replay fall back to calling the actions."""
+    engine, start = build_engine(JournalStore(tmp_path))
+    recorded = engine.run(DummyState(), start, n=3)
+
+    base = DummyState()
+    ctx = engine.replay(recorded.run_id, base, start, n=5)
+    assert ctx.journal is not None and ctx.journal.diverged_at == 0
+    assert base.calls == ["start", "select", "double", "select", "finish"]
+    assert ctx.params.get_state("total") == 10
+
+
+class Handle:
+    def __init__(self, n: int) -> None:
+        self.n = n
+
+    def __reduce__(self) -> tuple[()]:
+        raise TypeError("Handle cannot be pickled")
+
+
+def test_replay_runs_unfingerprintable_inputs_live(tmp_path: Path) -> None:
+    """Inputs that cannot be fingerprinted are never matched against the journal."""
+
+    def action_selector(base: DummyState, actions: List[Action]) -> Action:
+        return next((a for a in actions if a.final), actions[0])
+
+    engine: Engine[DummyState] = Engine(
+        DummyState, action_selector, journal=JournalStore(tmp_path)
+    )
+
+    @engine.action()
+    def start(base: DummyState, handle: Handle) -> Annotated[int, Tag("total")]:
+        base.calls.append("start")
+        return handle.n * 2
+
+    @engine.action(terminal=True)
+    def finish(base: DummyState, total: int) -> None:
+        pass
+
+    recorded = engine.run(DummyState(), start, handle=Handle(3))
+    base = DummyState()
+    ctx = engine.replay(recorded.run_id, base, start, handle=Handle(5))
+    assert base.calls == ["start"]
+    assert ctx.params.get_state("total") == 10
+
+
+def test_replay_ignores_truncated_tail(tmp_path: Path) -> None:
+    """An entry cut off by a crash is dropped and the replay continues live from it."""
+    store = JournalStore(tmp_path)
+    engine, start = build_engine(store)
+    recorded = engine.run(DummyState(), start, n=3)
+    path = tmp_path / f"{recorded.run_id}.journal"
+    path.write_bytes(path.read_bytes()[:-5])
+    assert len(store.load(recorded.run_id)) == 2
+
+    base = DummyState()
+    ctx = engine.replay(recorded.run_id, base, start, n=3)
+    assert base.calls == ["select", "finish"]
+    assert ctx.params.get_state("total") == 6
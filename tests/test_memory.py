@@ -0,0 +1,44 @@
+"""Tests for the bounded agent memory and its background log writer."""
+
+from __future__ import annotations
+from pathlib import Path
+from action_engine.memory import LogWriter, Memory
+
+
+def test_memory_is_bounded_and_renders_newest_first(tmp_path: Path) -> None:
+    """Old entries are evicted, and the prompt is cached until the next add."""
+    memory = Memory(capacity=2, log=LogWriter(tmp_path / "memory.log", flush_interval=60))
+    for item in ["searched", "watched", "commented"]:
+        memory.add(item)
+
+    assert [item for item, _ in memory] == ["watched", "commented"]
+    prompt = memory.prompt()
+    assert [line.split(" - ")[1] for line in prompt.splitlines()] == ["commented", "watched"]
+    assert memory.prompt() is prompt
+
+    memory.close()
+    lines = (tmp_path / "memory.log").read_text().splitlines()
+    assert [line.split(" - ")[1] for line in lines] == ["searched", "watched", "commented"]
+
+
+def test_log_writer_batches_and_rotates(tmp_path: Path) -> None:
+    """Lines are flushed in batches and the file rotates past max_bytes."""
+    path = tmp_path / "agent.log"
+    writer = LogWriter(path, batch_size=4, flush_interval=60, max_bytes=20, backups=2)
+    for i in range(3):
+        writer.write(f"line {i}\n")
+    writer.flush()
+    assert path.read_text() == "line 0\nline 1\nline 2\n"
+
+    for i in range(3, 7):
+        writer.write(f"line {i}\n")
+    writer.flush()
+    writer.write("line 7\n")
+    writer.write("line 8\n")
+    writer.close()
+    assert (tmp_path / "agent.log.1").exists()
+    assert (tmp_path / "agent.log.2").exists()
+    written = "".join(
+        p.read_text() for p in [tmp_path / "agent.log.2", tmp_path / "agent.log.1", path]
+    )
+    assert written.splitlines() == [f"line {i}" for i in range(9)]
@@ -50,3 +50,31 @@ def test_param_set_subset() -> None:
     set2: ParamSet = ParamSet([param_a, param_b])
     assert set1 <= set2
     assert not (set2 <= set1)
+
+
+def test_param_of_is_interned_and_frozen() -> None:
+    """
+    Verify that Param.of returns one shared, immutable instance per
+    (name, type) pair.
+    """
+    param = Param.of("interned", int)
+    assert param is Param.of("interned", int)
+    assert param == Param(name="interned", type_=int)
+    assert param is not Param.of("interned", str)
+    with pytest.raises(AttributeError):
+        param.name = "other"  # type: ignore[misc]
+
+
+def test_stateful_param_set_deep_validation() -> None:
+    """
+    Verify that deep validation rejects collections with wrong item types
+    and that the present param records the value's runtime type.
+    """
+    shallow: StatefulParamSet = StatefulParamSet([])
+    deep: StatefulParamSet = StatefulParamSet([], validation="deep")
+    param_list: Param = Param(name="ids", type_=list[int])
+    shallow.set_state(param_list, ["1"])
+    with pytest.raises(AssertionError):
+        deep.set_state(param_list, ["1"])
+    deep.set_state(param_list, [1])
+    assert deep.get("ids") == Param(name="ids", type_=list)
@@ -0,0 +1,111 @@
+"""Tests for compiling an engine into a Plan with slot-table run state."""
+
+from __future__ import annotations
+from typing import Annotated, List
+import pytest
+from pydantic import BaseModel
+from action_engine.action import Action
+from action_engine.engine import Engine
+from action_engine.param import Param
+from action_engine.param_functions import Tag, Deps
+from action_engine.plan import SlotParamSet
+
+
+class DummyState(BaseModel):
+    steps: int = 0
+
+
+def build_engine() -> Engine[DummyState]:
+    def action_selector(base: DummyState, actions: List[Action]) -> Action:
+        base.steps += 1
+        names = [a.name for a in actions]
+        for name in ("finish", "summarize", "fetch", "load"):
+            if name in names:
+                return actions[names.index(name)]
+        raise AssertionError(names)
+
+    engine = Engine(DummyState, action_selector)
+
+    @engine.action()
+    def load(base: DummyState) -> Annotated[int, Tag("repo", cascade=True)]:
+        return 1
+
+    @engine.action()
+    def fetch(
+        base: DummyState, repo: Annotated[int, Deps(["issue"])]
+    ) -> Annotated[str, Tag("issue")]:
+        return "bug"
+
+    @engine.action()
+    def summarize(
+        base: DummyState, repo: int, issue: str
+    ) -> Annotated[str, Tag("summary")]:
+        return f"{issue} in repo {repo}"
+
+    @engine.action(terminal=True)
+    def finish(base: DummyState, summary: str) -> None:
+        pass
+
+    return engine
+
+
+def test_compiled_engine_runs_like_uncompiled() -> None:
+    """A compiled engine keeps its state in slots and reaches the same result."""
+    engine = build_engine()
+    expected = engine.run(DummyState()).params.get_state("summary")
+
+    plan = engine.compile()
+    assert plan.params[plan.param_ids["repo"]] == "repo"
+    ctx = engine.run(DummyState())
+    assert isinstance(ctx.params, SlotParamSet)
+    assert ctx.params.get_state("summary") == expected == "bug in repo 1"
+    assert ctx.base_state.steps == 4
+
+    with pytest.raises(RuntimeError):
+        engine.action()(lambda base: None)
+
+
+def test_slot_param_set_readiness_and_cascade() -> None:
+    """Readiness follows value types and cascades clear dependent slots."""
+    engine = build_engine()
+    engine.compile()
+    ctx = engine.create_context()
+    ctx.params.set_state(Param.of("base", DummyState), DummyState())
+    assert [a.name for a in ctx.filter_actions()] == ["load"]
+
+    ctx.params.set_state(Param.of("repo", int), 1)
+    assert [a.name for a in ctx.filter_actions()] == ["load", "fetch"]
+    ctx.params.set_state(Param.of("issue", str), "bug")
+    assert [a.name for a in ctx.filter_actions()] == ["load", "fetch", "summarize"]
+
+    # A value of an incompatible type does not satisfy the consumer.
+    ctx.params.set_state(Param.of("issue", str | int), 3)
+    assert [a.name for a in ctx.filter_actions()] == ["load", "fetch"]
+
+    ctx.params.set_state(Param.of("issue", str), "bug")
+    ctx.cascade("repo")
+    assert "issue" not in ctx.params and "repo" in ctx.params
+    assert [p.name for p in ctx.params] == ["base", "repo"]
+
+
+def test_compiled_engine_keeps_params_without_slots() -> None:
+    """Params no action consumes, like an untaken base, are still accepted."""
+    finished: list[bool] = []
+
+    def action_selector(base: DummyState, actions: List[Action]) -> Action:
+        return actions[0]
+
+    engine = Engine(DummyState, action_selector)
+
+    @engine.action(terminal=True)
+    def fin() -> None:
+        finished.append(True)
+
+    plan = engine.compile()
+    assert "base" not in plan.param_ids
+    ctx = engine.run(DummyState(steps=3))
+    assert finished == [True]
+    assert ctx.base_state.steps == 3
+    assert "base" in ctx.params and len(ctx.params) == 1
+    ctx.params.discard_all(["base"])
+    assert "base" not in ctx.params
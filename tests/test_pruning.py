@@ -0,0 +1,82 @@
+"""Tests for pruning ready actions that cannot lead to a terminal action."""
+
+from __future__ import annotations
+from typing import Annotated
+import pytest
+from pydantic import BaseModel
+from action_engine.engine import Engine
+from action_engine.param import Param
+from action_engine.param_functions import Tag
+from action_engine.pruning import Pruning
+
+
+class DummyState(BaseModel):
+    pass
+
+
+def build_engine(pruning: Pruning) -> Engine[DummyState]:
+    engine: Engine[DummyState] = Engine(
+        DummyState, lambda base, acts: acts[0], pruning=pruning
+    )
+
+    @engine.action()
+    def log_repo(base: DummyState, repo: str) -> Annotated[str, Tag("note")]:
+        return repo
+
+    @engine.action()
+    def get_issue(base: DummyState, repo: str) -> Annotated[int, Tag("issue")]:
+        return 1
+
+    @engine.action()
+    def summarize(base: DummyState, issue: int) -> Annotated[str, Tag("summary")]:
+        return "summary"
+
+    @engine.action()
+    def translate(base: DummyState, summary: str, lang: str) -> Annotated[str, Tag("text")]:
+        return summary
+
+    @engine.action(terminal=True)
+    def finish(base: DummyState, summary: str) -> None:
+        pass
+
+    return engine
+
+
+@pytest.mark.parametrize(
+    "pruning, expected",
+    [
+        ("off", ["log_repo", "get_issue"]),
+        ("filter", ["get_issue"]),
+        ("rank", ["get_issue", "log_repo"]),
+    ],
+)
+def test_pruning_policies(pruning: Pruning, expected: list[str]) -> None:
+    """Dead-end candidates are kept, filtered out or ranked last."""
+    engine = build_engine(pruning)
+    ctx = engine.create_context()
+    ctx.params.set_state(Param.of("base", DummyState), DummyState())
+    ctx.params.set_state(Param.of("repo", str), "owner/name")
+    assert [a.name for a in ctx.filter_actions()] == expected
+
+    progressing = engine.pruner.progressing(frozenset({"base", "repo"}))
+    assert progressing == {"get_issue", "summarize", "finish"}
+
+
+def test_pruning_keeps_candidates_without_progress() -> None:
+    """When no candidate can reach a terminal action, filtering keeps them all."""
+    engine: Engine[DummyState] = Engine(
+        DummyState, lambda base, acts: acts[0], pruning="filter"
+    )
+
+    @engine.action()
+    def load(base: DummyState) -> Annotated[str, Tag("repo")]:
+        return "repo"
+
+    @engine.action(terminal=True)
+    def approve(base: DummyState, approval: bool) -> None:
+        pass
+
+    ctx = engine.create_context()
+    ctx.params.set_state(Param.of("base", DummyState), DummyState())
+    assert engine.pruner.progressing(frozenset({"base"})) == frozenset()
+    assert [a.name for a in ctx.filter_actions()] == ["load"]
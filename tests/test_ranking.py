@@ -0,0 +1,58 @@
+"""Tests for the candidate ranking stage between filtering and selection."""
+
+from __future__ import annotations
+from typing import Annotated, Any, List
+from pydantic import BaseModel
+from action_engine.action import Action
+from action_engine.context import RunContext
+from action_engine.engine import Engine
+from action_engine.param_functions import Tag
+from action_engine.ranking import ActionStats, Ranker, novelty
+
+
+class DummyState(BaseModel):
+    seen: list[list[str]] = []
+
+
+def prefer_finish(ctx: RunContext[Any], action: Action, stats: ActionStats) -> float:
+    return 1.0 if action.final else 0.0
+
+
+def test_ranker_truncates_candidates_and_records_stats() -> None:
+    """The selector only sees the top-k candidates, and invocations are recorded."""
+
+    def action_selector(base: DummyState, actions: List[Action]) -> Action:
+        base.seen.append([a.name for a in actions])
+        return actions[0]
+
+    ranker = Ranker(top_k=1, scorers=[(prefer_finish, 1.0), (novelty, 0.5)])
+    engine = Engine(DummyState, action_selector, ranker=ranker)
+
+    @engine.action()
+    def search(base: DummyState) -> Annotated[int, Tag("hits")]:
+        return 1
+
+    @engine.action()
+    def fetch(base: DummyState) -> Annotated[str, Tag("page")]:
+        return "page"
+
+    @engine.action(terminal=True)
+    def finish(base: DummyState, hits: int, page: str) -> None:
+        pass
+
+    ctx = engine.run(DummyState())
+    # fetch is preferred on step 2 because search was just used.
+    assert ctx.base_state.seen == [["search"], ["fetch"], ["finish"]]
+    assert {name: s.calls for name, s in ranker.stats.items()} == {
+        "search": 1,
+        "fetch": 1,
+        "finish": 1,
+    }
+    metrics = ranker.metrics
+    assert (metrics.calls, metrics.candidates_in, metrics.candidates_out) == (3, 7, 3)
+    assert metrics.mean_ns > 0
+
+    # Recency is per run: another run has not used search yet.
+    other = engine.create_context()
+    assert novelty(ctx, search, ranker.stats["search"]) < 0
+    assert novelty(other, search, ranker.stats["search"]) == 0
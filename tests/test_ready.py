@@ -0,0 +1,59 @@
+"""Tests for the ReadyIndex used by the engine to filter actions."""
+
+from __future__ import annotations
+from typing import Annotated
+from action_engine.action import Action
+from action_engine.param import Param, StatefulParamSet
+from action_engine.param_functions import Tag
+from action_engine.ready import ActionIndex, ReadyIndex
+
+
+def source() -> Annotated[int, Tag("a")]:
+    return 1
+
+
+def needs_a(a: int) -> Annotated[str, Tag("b")]:
+    return str(a)
+
+
+def needs_a_and_b(a: int, b: str) -> None:
+    pass
+
+
+def test_ready_index_tracks_set_and_discard() -> None:
+    """
+    Verify that the ready set follows set_state/discard and always agrees
+    with can_invoke_with, in registration order.
+    """
+    registry = ActionIndex()
+    actions = [
+        Action(fn, final=False, description="")
+        for fn in (source, needs_a, needs_a_and_b)
+    ]
+    for action in actions:
+        registry.register(action)
+    index = ReadyIndex(registry)
+    state = StatefulParamSet([], index=index)
+
+    def expected() -> list[str]:
+        return [a.name for a in actions if a.can_invoke_with(state)]
+
+    assert [a.name for a in index.ready()] == expected() == ["source"]
+
+    state.set_state(Param(name="a", type_=int), 1)
+    assert [a.name for a in index.ready()] == expected()
+    assert expected() == ["source", "needs_a"]
+
+    state.set_state(Param(name="b", type_=str), "1")
+    assert [a.name for a in index.ready()] == expected()
+    assert expected() == ["source", "needs_a", "needs_a_and_b"]
+
+    # A value of an incompatible type does not satisfy the consumer.
+    state.set_state(Param(name="a", type_=bool), True)
+    state.set_state(Param(name="a", type_=str), "x")
+    assert [a.name for a in index.ready()] == expected() == ["source"]
+
+    state.discard("b")
+    state.set_state(Param(name="a", type_=int), 2)
+    assert [a.name for a in index.ready()] == expected()
+    assert expected() == ["source", "needs_a"]
@@ -0,0 +1,118 @@
+"""Tests for pooled resources injected into actions."""
+
+from __future__ import annotations
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from typing import Annotated, List
+import pytest
+from pydantic import BaseModel
+from action_engine.action import Action
+from action_engine.engine import Engine
+from action_engine.param_functions import Tag
+
+
+class DummyState(BaseModel):
+    pass
+
+
+class Client:
+    def __init__(self) -> None:
+        self.open = True
+        self.calls = 0
+
+
+def action_selector(base: DummyState, actions: List[Action]) -> Action:
+    return next((a for a in actions if a.final), actions[0])
+
+
+def test_resources_are_pooled_injected_and_torn_down() -> None:
+    """Concurrent runs share at most max_size instances, closed on shutdown."""
+    engine = Engine(DummyState, action_selector)
+    created: list[Client] = []
+
+    @engine.resource(max_size=2)
+    def client() -> Iterator[Client]:
+        c = Client()
+        created.append(c)
+        yield c
+        c.open = False
+
+    @engine.action()
+    async def fetch(base: DummyState, client: Client) -> Annotated[int, Tag("value")]:
+        client.calls += 1
+        await asyncio.sleep(0.01)
+        return client.calls
+
+    @engine.action(terminal=True)
+    def store(base: DummyState, value: int, api: Client) -> None:
+        assert api.open
+
+    # Injected params are not read from the run's params
+    assert [p.name for p in fetch.input_params] == ["base"]
+    assert set(store.resources) == {"api"}
+
+    async def main() -> None:
+        await asyncio.gather(*(engine.arun(DummyState()) for _ in range(6)))
+
+    asyncio.run(main())
+    assert len(created) == 2
+    assert sum(c.calls for c in created) == 6
+    assert engine.resources["client"].idle == 2
+
+    engine.shutdown()
+    assert not any(c.open for c in created)
+    with pytest.raises(RuntimeError):
+        engine.run(DummyState())
+
+
+def test_resource_type_must_be_unambiguous() -> None:
+    """A param matching several resources by type is rejected."""
+    engine = Engine(DummyState, action_selector)
+    engine.resource(name="primary")(Client)
+    engine.resource(name="replica")(Client)
+
+    with pytest.raises(ValueError, match="several resources"):
+
+        @engine.action(terminal=True)
+        def query(base: DummyState, db: Client) -> None:
+            pass
+
+
+def test_builtin_types_are_only_injected_by_name() -> None:
+    """A str resource does not capture every str param."""
+    engine = Engine(DummyState, action_selector)
+
+    @engine.resource()
+    def api_key() -> str:
+        return "secret"
+
+    @engine.action(terminal=True)
+    def greet(base: DummyState, username: str, api_key: str) -> None:
+        pass
+
+    assert [p.name for p in greet.input_params] == ["base", "username"]
+    assert set(greet.resources) == {"api_key"}
+
+
+def test_async_instances_stay_on_their_event_loop() -> None:
+    """Each run gets a session of its own loop, torn down before the loop closes."""
+    engine = Engine(DummyState, action_selector)
+    sessions: list[tuple[asyncio.AbstractEventLoop, list[bool]]] = []
+
+    @engine.resource()
+    async def session() -> AsyncIterator[list[bool]]:
+        state = [True]
+        sessions.append((asyncio.get_running_loop(), state))
+        yield state
+        state[0] = False
+
+    @engine.action(terminal=True)
+    async def fetch(base: DummyState, session: list[bool]) -> None:
+        assert session[0]
+        assert sessions[-1] == (asyncio.get_running_loop(), session)
+
+    engine.run(DummyState())
+    engine.run(DummyState())
+    assert len(sessions) == 2
+    assert not any(state[0] for _, state in sessions)
+    assert engine.resources["session"].size == 0
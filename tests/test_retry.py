@@ -0,0 +1,84 @@
+"""Tests for retry policies and rate limiting of actions."""
+
+from __future__ import annotations
+import asyncio
+import time
+from typing import Annotated, List
+import pytest
+from pydantic import BaseModel
+from action_engine.action import Action
+from action_engine.engine import Engine
+from action_engine.param_functions import Tag
+from action_engine.retry import RateLimiter, RetryPolicy
+
+
+class DummyState(BaseModel):
+    attempts: int = 0
+
+
+def action_selector(base: DummyState, actions: List[Action]) -> Action:
+    return next((a for a in actions if a.final), actions[0])
+
+
+def test_retry_until_success_and_timeout() -> None:
+    """Failures are retried with backoff, and a hung attempt times out."""
+    engine = Engine(DummyState, action_selector)
+
+    @engine.action(retry=RetryPolicy(retries=2, backoff=0.001, retry_on=(ConnectionError,)))
+    async def flaky(base: DummyState) -> Annotated[int, Tag("value")]:
+        base.attempts += 1
+        if base.attempts < 3:
+            raise ConnectionError("429 Too Many Requests")
+        return base.attempts
+
+    @engine.action(terminal=True)
+    def finish(base: DummyState, value: int) -> None:
+        pass
+
+    assert engine.run(DummyState()).params.get_state("value") == 3
+
+    hung = Engine(DummyState, action_selector)
+
+    @hung.action(terminal=True, retry=RetryPolicy(timeout=0.01, retries=1, backoff=0.001))
+    async def stall(base: DummyState) -> None:
+        base.attempts += 1
+        await asyncio.sleep(10)
+
+    base = DummyState()
+    with pytest.raises(TimeoutError):
+        hung.run(base)
+    assert base.attempts == 2
+
+    blocking = Engine(DummyState, action_selector)
+
+    @blocking.action(terminal=True, retry=RetryPolicy(timeout=0.05))
+    def block(base: DummyState) -> None:
+        time.sleep(0.5)
+
+    assert block.executor == "thread"
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        blocking.run(DummyState())
+    assert time.monotonic() - start < 0.4
+    blocking.shutdown(wait=False)
+
+
+def test_rate_limiter_spaces_calls_across_runs() -> None:
+    """Runs sharing a rate limit are held to the limiter's rate."""
+    engine = Engine(
+        DummyState, action_selector, rate_limits={"api": RateLimiter(rate=100, burst=1)}
+    )
+
+    @engine.action(terminal=True, rate_limit="api")
+    async def call_api(base: DummyState) -> None:
+        pass
+
+    async def main() -> None:
+        await asyncio.gather(*(engine.arun(DummyState()) for _ in range(6)))
+
+    start = time.monotonic()
+    asyncio.run(main())
+    assert time.monotonic() - start >= 0.045
+
+    with pytest.raises(ValueError):
+        engine.action(rate_limit="unknown")
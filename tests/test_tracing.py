@@ -0,0 +1,123 @@
+"""Tests for step-level tracing hooks and exporters."""
+
+from __future__ import annotations
+import json
+from pathlib import Path
+from typing import Annotated, List
+import pytest
+from pydantic import BaseModel
+from action_engine.action import Action
+from action_engine.engine import Engine
+from action_engine.param_functions import Tag, Deps
+from action_engine.tracing import JsonlExporter, OtelSpanAdapter, TraceEvent
+
+
+class DummyState(BaseModel):
+    counter: int = 0
+
+
+def build_engine() -> Engine[DummyState]:
+    def action_selector(base: DummyState, actions: List[Action]) -> Action:
+        return actions[-1]
+
+    engine: Engine[DummyState] = Engine(DummyState, action_selector)
+
+    @engine.action()
+    def load(base: DummyState) -> Annotated[int, Tag("item", cascade=True)]:
+        base.counter += 1
+        return base.counter
+
+    @engine.action(terminal=True)
+    def finish(base: DummyState, item: Annotated[int, Deps(["other"])]) -> None:
+        pass
+
+    return engine
+
+
+def test_engine_emits_phase_events() -> None:
+    """
+    Test that each step emits filter, select, invoke, update and step events
+    with monotonic timestamps, that cascades and the run are traced too, and
+    that each event names the enclosing phase as its parent.
+    """
+    engine = build_engine()
+    events: list[TraceEvent] = []
+    engine.add_listener(events.append)
+    ctx = engine.run(DummyState())
+
+    phases = [(e.step, e.phase, e.action) for e in events]
+    assert phases == [
+        (1, "filter", None),
+        (1, "select", None),
+        (1, "invoke", "load"),
+        (1, "cascade", None),
+        (1, "update", "load"),
+        (1, "step", None),
+        (2, "filter", None),
+        (2, "select", None),
+        (2, "invoke", "finish"),
+        (2, "update", "finish"),
+        (2, "step", None),
+        (0, "run", None),
+    ]
+    assert all(e.run_id == ctx.run_id for e in events)
+    assert all(0 <= e.duration_ns for e in events)
+    assert events[0].attributes == {"candidates": 1}
+    assert events[-1].attributes == {"steps": 2}
+
+    by_id = {e.span_id: e for e in events}
+    assert len(by_id) == len(events)
+    parents = [
+        (e.phase, None if e.parent_id is None else by_id[e.parent_id].phase)
+        for e in events
+    ]
+    assert parents == [
+        ("filter", "step"),
+        ("select", "step"),
+        ("invoke", "step"),
+        ("cascade", "update"),
+        ("update", "step"),
+        ("step", "run"),
+        ("filter", "step"),
+        ("select", "step"),
+        ("invoke", "step"),
+        ("update", "step"),
+        ("step", "run"),
+        ("run", None),
+    ]
+
+
+def test_jsonl_and_otel_exporters(tmp_path: Path) -> None:
+    """
+    Test that the JSONL exporter writes one line per event and that the span
+    adapter marks failing phases with an error status.
+    """
+    engine = build_engine()
+    path = tmp_path / "trace.jsonl"
+    exporter = JsonlExporter(path)
+    adapter = OtelSpanAdapter(service_name="test")
+    engine.add_listener(exporter)
+    engine.add_listener(adapter)
+
+    @engine.action()
+    def explode(base: DummyState) -> None:
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        engine.run(DummyState())
+    exporter.close()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) == len(adapter.spans)
+    assert lines[2] == {**lines[2], "phase": "invoke", "action": "explode"}
+
+    span = adapter.spans[2]
+    assert span["name"] == "action_engine.invoke"
+    assert span["status"] == {"code": "STATUS_CODE_ERROR", "message": "RuntimeError('boom')"}
+    assert span["attributes"]["action_engine.action"] == "explode"
+    assert span["end_time_unix_nano"] >= span["start_time_unix_nano"]
+    assert len(span["trace_id"]) == 32
+    parents = {s["span_id"]: s for s in adapter.spans}
+    assert parents[span["parent_span_id"]]["name"] == "action_engine.step"
+    assert adapter.spans[-1]["name"] == "action_engine.run"
+    assert adapter.spans[-1]["parent_span_id"] == ""
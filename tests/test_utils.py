@@ -0,0 +1,52 @@
+"""Tests for the prompt rendering helpers."""
+
+from __future__ import annotations
+from collections.abc import Sequence
+from action_engine.utils import HistoryRenderer, indexed_candidates, indexed_str
+
+
+def test_history_renderer_matches_indexed_str_incrementally() -> None:
+    """Appending entries gives the same text as rendering from scratch."""
+    renderer = HistoryRenderer("Past actions")
+    history: list[str] = []
+    assert renderer.render(history) == indexed_str("Past actions", history)
+    for i in range(5):
+        history.append(f"action {i}")
+        assert renderer.render(history) == indexed_str("Past actions", history)
+
+    fresh = ["other"]
+    assert renderer.render(fresh) == indexed_str("Past actions", fresh)
+
+
+def test_history_renderer_stays_within_budget() -> None:
+    """Past the budget, the head and most recent entries are kept."""
+    calls: list[int] = []
+
+    def summarize(summary: str | None, dropped: Sequence[str]) -> str:
+        calls.append(len(dropped))
+        return f"({sum(calls)} earlier)"
+
+    renderer = HistoryRenderer("History", budget=60, head=1, summarize=summarize)
+    history = [f"step {i}" for i in range(100)]
+    text = renderer.render(history)
+    assert text.startswith("History: \n0: step 0\n(")
+    assert text.endswith("99: step 99\n")
+    lines = text.splitlines()
+    kept = len(lines) - 3
+    assert lines[2] == f"({99 - kept} earlier)"
+    assert len(text) - len(lines[2]) - 1 <= 60
+
+    # The summary is only extended with the entries dropped since
+    for i in range(100, 110):
+        history.append(f"step {i}")
+        text = renderer.render(history)
+    assert text.endswith("108: step 108\n109: step 109\n")
+    assert calls[0] == 99 - kept and all(n <= 2 for n in calls[1:])
+    assert text.splitlines()[2] == f"({109 - len(text.splitlines()) + 3} earlier)"
+
+
+def test_indexed_candidates_renders_each_list_once() -> None:
+    """The same candidates give back the cached text."""
+    first = indexed_candidates("Possible actions", ["a", "b"])
+    assert first == indexed_str("Possible actions", ["a", "b"])
+    assert indexed_candidates("Possible actions", ("a", "b")) is first